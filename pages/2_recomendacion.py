@@ -5,14 +5,11 @@ Esta página muestra las recomendaciones de prestadores basadas en el triage
 completado, con dos tabs: Resumen y Ruta.
 """
 
+from functools import lru_cache
+
 import streamlit as st
-from streamlit_option_menu import option_menu
-import folium
-from streamlit_folium import st_folium
-from folium import plugins
 
-from utils.ui_style import general_style_orch
-from utils.ui_blocks import menu, fixed_header, options_navigation_recomendacion
+from utils.ui_blocks import init_page, options_navigation_recomendacion
 from utils.matching_utils.recommendation_engine import (
     build_triage_correspondence_table,
     get_recommended_services,
@@ -20,21 +17,14 @@ from utils.matching_utils.recommendation_engine import (
     load_and_prepare_provider_data,
 )
 from utils.general_utils import text_cleaning
-from utils.debug_utils import show_recommendation_debug_info
+from utils.ui_geocode import reverse_geocode_arcgis
+from utils.debug_utils import DEBUG_ENABLED, show_recommendation_debug_info
 
 
 # -------------------------------------------------------------------------
 ## Inicialización de estilos y componentes
 
-general_style_orch()
-menu()
-
-# Variables para el header
-identificacion_paciente = st.session_state.get("identificacion_paciente", "")
-decision = st.session_state.get("decision", "")
-ciudad = st.session_state.get("ciudad", "")
-
-fixed_header(identificacion_paciente, decision, ciudad)
+init_page()  # Styles, sidebar menu and patient header
 
 # -------------------------------------------------------------------------
 ## Verificar que el usuario haya completado el triage
@@ -47,23 +37,28 @@ if not st.session_state.get("triage_completed", False):
 # -------------------------------------------------------------------------
 ## Título de la página
 
-st.markdown("")
-st.markdown("# Recomendación de Prestadores")
-st.markdown("___")
+st.markdown(
+    "<div style='margin-bottom: 10px;'></div>\n\n"
+    "# Recomendación de Prestadores\n\n___",
+    unsafe_allow_html=True,
+)
 
 # -------------------------------------------------------------------------
 ## Procesamiento de datos de recomendación
 
-# Inicializar variables de sesión para esta página
-if "recommendation_data_loaded" not in st.session_state:
-    st.session_state.recommendation_data_loaded = False
+# Inicializar variables de sesión para esta página (clave, valor)
+_DEFAULTS = (
+    ("recommendation_data_loaded", False),
+    ("selected_provider_for_route", None),
+    # Estado de la pestaña de la pagina de recomendaciones
+    ("current_tab_recomendacion", "Resumen"),
+)
 
-if "selected_provider_for_route" not in st.session_state:
-    st.session_state.selected_provider_for_route = None
+for key, value in _DEFAULTS:
+    st.session_state.setdefault(key, value)
 
-# Inicializa el estado de la pestaña de la pagina de recomendaciones
-if "current_tab_recomendacion" not in st.session_state:
-    st.session_state.current_tab_recomendacion = "Resumen"
+# Parámetros de la tabla de correspondencia triage → servicios
+_CORRESPONDENCE_PARAMS = {"threshold": 0.7, "top_k": 2, "method": "semantic"}
 
 # Extract user data from session state
 categoria = st.session_state.get("selected_categoria", "")
@@ -76,12 +71,23 @@ user_city = st.session_state.get("ciudad", "")
 user_location = st.session_state.get("ubicacion_usuario")
 
 # -------------------------------------------------------------------------
-# Cargar datos de recomendación una sola vez
-# if not st.session_state.recommendation_data_loaded:
-with st.spinner("🔄 Cargando sistema de recomendación..."):
+# Cargar datos de recomendación solo cuando cambian las entradas del usuario
+# (las coordenadas se redondean a ~10 m para ignorar variaciones mínimas)
+recommendation_key = (
+    categoria,
+    nivel_triage,
+    especialidad,
+    user_dept,
+    user_city,
+    round(user_location["lat"], 4) if user_location else None,
+    round(user_location["lng"], 4) if user_location else None,
+)
+
+# La tabla de correspondencia muestra su propio spinner solo cuando se construye
+if st.session_state.get("recommendation_key") != recommendation_key:
     try:
         df_correspondencia = build_triage_correspondence_table(
-            threshold=0.7, top_k=2, method="semantic"
+            **_CORRESPONDENCE_PARAMS
         )
 
         recomendacion = get_recommended_services(
@@ -95,8 +101,6 @@ with st.spinner("🔄 Cargando sistema de recomendación..."):
         scores = recomendacion["scores"]
         tipo_match = recomendacion["tipo"]
 
-        df_prestadores = load_and_prepare_provider_data()
-
         providers_filtered = filter_providers_by_service_and_location(
             servicios=servicios_recomendados,
             departamento=user_dept,
@@ -105,14 +109,35 @@ with st.spinner("🔄 Cargando sistema de recomendación..."):
             max_distance_km=100.0,
         )
 
+        # Vista reducida para la tabla del Resumen (se calcula una sola vez)
+        display_cols = [
+            "prestador",
+            # "servicio_prestador",
+            "direccion",
+            "telefono_fijo",
+        ]
+        if "distancia_km" in providers_filtered.columns:
+            display_cols.append("distancia_km")
+        # display_cols.append("prioridad_recomendacion")
+
         # Guardar en session state
         st.session_state.recommended_providers = providers_filtered
+        st.session_state.providers_display = providers_filtered.loc[
+            :, display_cols
+        ].head(20)
+        # Top 5 compartido por las pestañas Resumen y Ruta
+        st.session_state.providers_top5 = providers_filtered.head(5)
         st.session_state.servicios_recomendados = servicios_recomendados
         st.session_state.scores_recomendacion = scores
         st.session_state.tipo_match = tipo_match
-        st.session_state.df_correspondencia = df_correspondencia
-        st.session_state.df_prestadores = df_prestadores
+        # Dirección del usuario para el mapa de ruta (una consulta por recomendación)
+        st.session_state.user_address = (
+            reverse_geocode_arcgis(user_location["lat"], user_location["lng"])
+            if user_location
+            else "N/A"
+        )
         st.session_state.recommendation_data_loaded = True
+        st.session_state.recommendation_key = recommendation_key
 
     except Exception as e:
         st.error(f"❌ Error al cargar el sistema de recomendación: {str(e)}")
@@ -121,132 +146,152 @@ with st.spinner("🔄 Cargando sistema de recomendación..."):
 
 # Recuperar datos del session state
 providers_filtered = st.session_state.recommended_providers
+providers_display = st.session_state.providers_display
+providers_top5 = st.session_state.providers_top5
 servicios_recomendados = st.session_state.servicios_recomendados
 scores = st.session_state.scores_recomendacion
 tipo_match = st.session_state.tipo_match
-df_correspondencia = st.session_state.df_correspondencia
-df_prestadores = st.session_state.df_prestadores
-
-# -------------------------------------------------------------------------
-## Navigation menu con option_menu
-
-selected_tab = options_navigation_recomendacion(
-    st.session_state.current_tab_recomendacion,
-)
-
-st.markdown("")
 
 # -------------------------------------------------------------------------
-## TAB: Resumen
-
-if selected_tab == "Resumen":
-    if len(providers_filtered) > 0:
-        st.info(
-            f"🔎  Se identificaron **{len(providers_filtered)}** prestadores recomendados"
-        )
-
-        # Display top 3 providers
-        st.markdown("### Top 3 - Prestadores Recomendados")
-        st.markdown("")
-
-        for idx, row in providers_filtered.head(5).iterrows():
-            with st.container():
-                col1, col2, col3 = st.columns([5, 2, 1])
-
-                with col1:
-                    st.markdown(f"**{row['prestador']}**")
-                    st.caption(f"📌 {row['direccion']}")
-                    st.caption(
-                        f"🏥 Servicio: {row['servicio_prestador'].replace('_', ' ').title()}"
-                    )
-                    if "distancia_km" in row and row["distancia_km"] is not None:
-                        st.caption(f"📏 Distancia: {row['distancia_km']:.2f} km")
-                    # st.caption(f"temp: {row.get('prioridad_recomendacion', 'N/A')}")
+## TAB: Ruta (fragmento)
 
-                with col2:
-                    if st.button(
-                        "🗺️ Ver Ruta", key=f"ver_ruta_{idx}", use_container_width=True
-                    ):
-                        st.session_state.selected_provider_for_route = idx
-                        st.session_state.current_tab_recomendacion = "Ruta"
-                        st.rerun()
-
-                st.markdown("---")
 
-        # Show full table
-        with st.expander("📊 Ver total prestadores recomendados", expanded=False):
-            display_cols = [
-                "prestador",
-                # "servicio_prestador",
-                "direccion",
-                "telefono_fijo",
-            ]
-            if "distancia_km" in providers_filtered.columns:
-                display_cols.append("distancia_km")
-            # display_cols.append("prioridad_recomendacion")
-
-            st.dataframe(
-                providers_filtered[display_cols].head(20),
-                use_container_width=True,
-            )
-    else:
-        st.warning(
-            f"⚠️ No se encontraron prestadores en {user_city}, {user_dept} "
-            f"para los servicios recomendados: {', '.join(servicios_recomendados)}"
-        )
-        st.info(
-            "💡 Intenta ampliar el radio de búsqueda o considera prestadores en ciudades cercanas."
-        )
-
-    st.markdown("___")
+@lru_cache(maxsize=128)
+def _google_maps_url(user_lat, user_lng, provider_lat, provider_lng):
+    """Google Maps driving directions URL from the user to the provider (memoized)."""
+    return (
+        f"https://www.google.com/maps/dir/?api=1"
+        f"&origin={user_lat},{user_lng}"
+        f"&destination={provider_lat},{provider_lng}"
+        f"&travelmode=driving"
+    )
 
-    # Show matching info
-    with st.expander("ℹ️ Información de Triage → Servicios", expanded=False):
-        st.write(f"**Nivel de triage:** {nivel_triage}")
-        st.write(f"**Especialidad requerida:** {especialidad}")
-        st.write(f"**Servicios sugeridos:** {', '.join(servicios_recomendados)}")
-        st.write(f"**Tipo de coincidencia:** {tipo_match}")
-        if scores:
-            st.write(f"**Confianza:** {', '.join([f'{s:.2f}' for s in scores])}")
 
-    # DEBUG info
-    show_recommendation_debug_info(
-        categoria=categoria,
-        nivel_triage=nivel_triage,
-        especialidad=especialidad,
-        user_dept=user_dept,
-        user_city=user_city,
-        user_location=user_location,
-        df_correspondencia=df_correspondencia,
-        servicios_recomendados=servicios_recomendados,
-        scores=scores,
-        tipo_match=tipo_match,
-        df_prestadores=df_prestadores,
-        providers_filtered=providers_filtered,
-        expanded=False,
+def _build_route_map(
+    user_lat,
+    user_lng,
+    provider_lat,
+    provider_lng,
+    prestador,
+    direccion,
+    distancia_km,
+    user_tooltip,
+):
+    """
+    Build the route map between the user and the selected provider.
+
+    A new map is built on every render: `st_folium` modifies the map it
+    receives, so it must not be shared between reruns or sessions.
+    """
+    import folium
+
+    # Create map centered between user and provider
+    center_lat = (user_lat + provider_lat) / 2
+    center_lng = (user_lng + provider_lng) / 2
+
+    # Canvas rendering for the route line and no fade/zoom animations: the
+    # map only shows two markers, so Leaflet has less to draw on each render
+    m = folium.Map(
+        location=[center_lat, center_lng],
+        zoom_start=13,
+        tiles="OpenStreetMap",
+        prefer_canvas=True,
+        control_scale=False,
+        fade_animation=False,
+        zoom_animation=False,
     )
 
-# -------------------------------------------------------------------------
-## TAB: Ruta
-
-elif selected_tab == "Ruta":
-    if len(providers_filtered) == 0:
+    # Add user marker (blue)
+    folium.Marker(
+        location=[user_lat, user_lng],
+        popup="Tu ubicación",
+        tooltip=user_tooltip,
+        icon=folium.Icon(color="green", icon="user", prefix="fa"),
+    ).add_to(m)
+
+    # Add provider marker (red)
+    folium.Marker(
+        location=[provider_lat, provider_lng],
+        popup=f"<b>{prestador}</b><br>{direccion}",
+        tooltip=prestador,
+        icon=folium.Icon(color="red", icon="hospital", prefix="fa"),
+    ).add_to(m)
+
+    # Add line between user and provider
+    folium.PolyLine(
+        locations=[[user_lat, user_lng], [provider_lat, provider_lng]],
+        color="blue",
+        weight=3,
+        opacity=0.7,
+        popup="Ruta estimada",
+    ).add_to(m)
+
+    # Add distance marker at midpoint
+    if distancia_km is not None:
+        folium.Marker(
+            location=[center_lat, center_lng],
+            icon=folium.DivIcon(
+                html=f"""
+                <div style="
+                    background-color: white;
+                    border: 2px solid #1976D2;
+                    border-radius: 6px;
+                    padding: 6px 75px 6px 4px;
+                    font-weight: bold;
+                    color: #1976D2;
+                    text-align: center;
+                    font-size: 12px;
+                    transform: translate(-50%, -50%);
+                    position: relative;
+                    white-space: nowrap;
+                    box-shadow: 0 0 4px rgba(0,0,0,0.2);
+                ">
+                    📏 {distancia_km:.2f} km
+                </div>
+                """,
+                icon_anchor=(
+                    0,
+                    0,
+                ),  # anchor top-left, but CSS translate recenters it
+            ),
+        ).add_to(m)
+
+    # Fit bounds to show both markers
+    m.fit_bounds([[user_lat, user_lng], [provider_lat, provider_lng]])
+
+    return m
+
+
+@st.fragment
+def _route_tab(providers_top5, user_location):
+    """
+    Render the 'Ruta' tab as a Streamlit fragment.
+
+    Selecting a provider only reruns this function (checkboxes and route map),
+    not the rest of the page.
+    """
+    # Folium / streamlit-folium solo se cargan al abrir la pestaña Ruta
+    from streamlit_folium import st_folium
+
+    if len(providers_top5) == 0:
         st.warning("⚠️ No hay prestadores disponibles para mostrar en el mapa.")
     else:
-        st.markdown("#### Seleccione un prestador para ver la ruta")
-        st.markdown("")
+        st.markdown(
+            "#### Seleccione un prestador para ver la ruta\n\n"
+            "<div style='margin-bottom: 10px;'></div>",
+            unsafe_allow_html=True,
+        )
 
         # Checkbox selection for top 5 providers
-        top3 = providers_filtered.head(5)
-
         selected_provider_idx = None
 
-        for idx, row in top3.iterrows():
+        for row in providers_top5.itertuples():
+            idx = row.Index
             col1, col2, col3 = st.columns([4, 1, 2])
 
             with col1:
                 is_selected = st.checkbox(
-                    f"**{row['prestador']}** - {row['direccion']}",
+                    f"**{row.prestador}** - {row.direccion}",
                     key=f"provider_checkbox_{idx}",
                     value=(st.session_state.selected_provider_for_route == idx),
                 )
@@ -256,38 +301,33 @@ elif selected_tab == "Ruta":
                     st.session_state.selected_provider_for_route = idx
 
             with col2:
-                if "distancia_km" in row and row["distancia_km"] is not None:
-                    st.caption(f"📏 {row['distancia_km']:.2f} km")
+                distancia_km = getattr(row, "distancia_km", None)
+                if distancia_km is not None:
+                    st.caption(f"📏 {distancia_km:.2f} km")
 
         st.markdown("---")
 
         # Display map with route
         if selected_provider_idx is not None:
-            selected_row = providers_filtered.loc[selected_provider_idx]
+            # Plain dict: the fields below are plain lookups, not Series access
+            selected_row = providers_top5.loc[selected_provider_idx].to_dict()
 
             st.markdown(f"#### 📍 Ruta hacia: **{selected_row['prestador']}**")
             st.markdown("")
 
-            # Create map centered between user and provider
+            # Coordinates of the user and the selected provider
             user_lat = user_location["lat"]
             user_lng = user_location["lng"]
             provider_lat = selected_row["lat"]
             provider_lng = selected_row["lng"]
 
-            # Calculate center point
-            center_lat = (user_lat + provider_lat) / 2
-            center_lng = (user_lng + provider_lng) / 2
-
             # -------
             ## External navigation link
 
             # st.markdown("#### Navegación externa")
 
-            google_maps_url = (
-                f"https://www.google.com/maps/dir/?api=1"
-                f"&origin={user_lat},{user_lng}"
-                f"&destination={provider_lat},{provider_lng}"
-                f"&travelmode=driving"
+            google_maps_url = _google_maps_url(
+                user_lat, user_lng, provider_lat, provider_lng
             )
 
             st.markdown(
@@ -298,74 +338,18 @@ elif selected_tab == "Ruta":
             st.markdown("---")
 
             # ------
-            # Create map
-            m = folium.Map(
-                location=[center_lat, center_lng],
-                zoom_start=13,
-                tiles="OpenStreetMap",
+            # Create map (the user address was looked up with the recommendation)
+            m = _build_route_map(
+                user_lat,
+                user_lng,
+                provider_lat,
+                provider_lng,
+                selected_row["prestador"],
+                selected_row["direccion"],
+                selected_row.get("distancia_km"),
+                st.session_state.get("user_address", "N/A"),
             )
 
-            # Add user marker (blue)
-            folium.Marker(
-                location=[user_lat, user_lng],
-                popup="Tu ubicación",
-                tooltip=st.session_state.get("cached_address", "N/A"),
-                icon=folium.Icon(color="green", icon="user", prefix="fa"),
-            ).add_to(m)
-
-            # Add provider marker (red)
-            folium.Marker(
-                location=[provider_lat, provider_lng],
-                popup=f"<b>{selected_row['prestador']}</b><br>{selected_row['direccion']}",
-                tooltip=selected_row["prestador"],
-                icon=folium.Icon(color="red", icon="hospital", prefix="fa"),
-            ).add_to(m)
-
-            # Add line between user and provider
-            folium.PolyLine(
-                locations=[[user_lat, user_lng], [provider_lat, provider_lng]],
-                color="blue",
-                weight=3,
-                opacity=0.7,
-                popup="Ruta estimada",
-            ).add_to(m)
-
-            # Add distance marker at midpoint
-            if (
-                "distancia_km" in selected_row
-                and selected_row["distancia_km"] is not None
-            ):
-                folium.Marker(
-                    location=[center_lat, center_lng],
-                    icon=folium.DivIcon(
-                        html=f"""
-                        <div style="
-                            background-color: white;
-                            border: 2px solid #1976D2;
-                            border-radius: 6px;
-                            padding: 6px 75px 6px 4px;
-                            font-weight: bold;
-                            color: #1976D2;
-                            text-align: center;
-                            font-size: 12px;
-                            transform: translate(-50%, -50%);
-                            position: relative;
-                            white-space: nowrap;
-                            box-shadow: 0 0 4px rgba(0,0,0,0.2);
-                        ">
-                            📏 {selected_row["distancia_km"]:.2f} km
-                        </div>
-                        """,
-                        icon_anchor=(
-                            0,
-                            0,
-                        ),  # anchor top-left, but CSS translate recenters it
-                    ),
-                ).add_to(m)
-
-            # Fit bounds to show both markers
-            m.fit_bounds([[user_lat, user_lng], [provider_lat, provider_lng]])
-
             # Display map
             center_column = st.columns([1, 8, 1])[1]
             with center_column:
@@ -386,15 +370,131 @@ elif selected_tab == "Ruta":
 
             with col2:
                 st.write(f"**Teléfono:** {selected_row.get('telefono_fijo', 'N/A')}")
-                if (
-                    "distancia_km" in selected_row
-                    and selected_row["distancia_km"] is not None
-                ):
+                if selected_row.get("distancia_km") is not None:
                     st.write(f"**Distancia:** {selected_row['distancia_km']:.2f} km")
 
         else:
             st.info("👆 Seleccione un prestador para visualizar la ruta en el mapa.")
 
+
+def _show_route(provider_idx):
+    """
+    Callback for the 'Ver Ruta' buttons.
+
+    Stores the provider and switches to the 'Ruta' tab before the script
+    reruns, so the navigation menu is drawn with the new tab on that same run.
+    """
+    st.session_state.selected_provider_for_route = provider_idx
+    st.session_state.current_tab_recomendacion = "Ruta"
+
+
+# -------------------------------------------------------------------------
+## Navigation menu con option_menu
+
+selected_tab = options_navigation_recomendacion(
+    st.session_state.current_tab_recomendacion,
+)
+
+st.markdown("")
+
+# -------------------------------------------------------------------------
+## TAB: Resumen
+
+if selected_tab == "Resumen":
+    if len(providers_filtered) > 0:
+        st.info(
+            f"🔎  Se identificaron **{len(providers_filtered)}** prestadores recomendados"
+        )
+
+        # Display top 3 providers
+        st.markdown(
+            "### Top 3 - Prestadores Recomendados\n\n"
+            "<div style='margin-bottom: 10px;'></div>",
+            unsafe_allow_html=True,
+        )
+
+        # itertuples evita construir una Serie por fila; los datos de cada
+        # prestador se envían en un solo bloque de texto en lugar de varios captions
+        for row in providers_top5.itertuples():
+            idx = row.Index
+            with st.container():
+                col1, col2, col3 = st.columns([5, 2, 1])
+
+                with col1:
+                    details = [
+                        f"📌 {row.direccion}",
+                        f"🏥 Servicio: {row.servicio_prestador.replace('_', ' ').title()}",
+                    ]
+                    distancia_km = getattr(row, "distancia_km", None)
+                    if distancia_km is not None:
+                        details.append(f"📏 Distancia: {distancia_km:.2f} km")
+
+                    st.markdown(f"**{row.prestador}**")
+                    st.caption("  \n".join(details))
+
+                with col2:
+                    st.button(
+                        "🗺️ Ver Ruta",
+                        key=f"ver_ruta_{idx}",
+                        use_container_width=True,
+                        on_click=_show_route,
+                        args=(idx,),
+                    )
+
+                st.markdown("---")
+
+        # Show full table
+        # A diferencia de un expander cerrado, el toggle evita serializar y
+        # enviar la tabla en cada rerun hasta que el usuario la activa
+        if st.toggle("📊 Ver total prestadores recomendados", key="show_full_table"):
+            st.dataframe(providers_display, use_container_width=True)
+    else:
+        st.warning(
+            f"⚠️ No se encontraron prestadores en {user_city}, {user_dept} "
+            f"para los servicios recomendados: {', '.join(servicios_recomendados)}"
+        )
+        st.info(
+            "💡 Intenta ampliar el radio de búsqueda o considera prestadores en ciudades cercanas."
+        )
+
+    st.markdown("___")
+
+    # Show matching info
+    with st.expander("ℹ️ Información de Triage → Servicios", expanded=False):
+        st.write(f"**Nivel de triage:** {nivel_triage}")
+        st.write(f"**Especialidad requerida:** {especialidad}")
+        st.write(f"**Servicios sugeridos:** {', '.join(servicios_recomendados)}")
+        st.write(f"**Tipo de coincidencia:** {tipo_match}")
+        if scores:
+            st.write(f"**Confianza:** {', '.join([f'{s:.2f}' for s in scores])}")
+
+    # DEBUG info (solo con TRIAGE_DEBUG activo; las tablas completas se
+    # toman de la cache en ese caso en lugar de guardarlas en session state)
+    if DEBUG_ENABLED:
+        show_recommendation_debug_info(
+            categoria=categoria,
+            nivel_triage=nivel_triage,
+            especialidad=especialidad,
+            user_dept=user_dept,
+            user_city=user_city,
+            user_location=user_location,
+            df_correspondencia=build_triage_correspondence_table(
+                **_CORRESPONDENCE_PARAMS
+            ),
+            servicios_recomendados=servicios_recomendados,
+            scores=scores,
+            tipo_match=tipo_match,
+            df_prestadores=load_and_prepare_provider_data(),
+            providers_filtered=providers_filtered,
+            expanded=False,
+        )
+
+# -------------------------------------------------------------------------
+## TAB: Ruta
+
+elif selected_tab == "Ruta":
+    _route_tab(providers_top5, user_location)
+
 # -------------------------------------------------------------------------
 ## Botón para regresar al inicio
 
@@ -422,7 +522,6 @@ with col_new_user:
         # Reset all session state variables
         for key in st.session_state.keys():
             del st.session_state[key]
-        # Navigate to the first page and tab
+        # Navigate to the first page and tab (switch_page already reruns)
         st.session_state.current_tab_triage = "Inicio"
-        st.rerun()
         st.switch_page("app.py")
@@ -5,9 +5,26 @@ Este módulo proporciona funciones para mostrar información técnica
 del pipeline de recomendación en formato de debug.
 """
 
+import os
+
 import streamlit as st
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List
+
+# El panel de debug solo se muestra con la variable de entorno TRIAGE_DEBUG
+# activa (p. ej. TRIAGE_DEBUG=1 streamlit run app.py)
+DEBUG_ENABLED = os.environ.get("TRIAGE_DEBUG", "").lower() in ("1", "true", "yes")
+
+
+@st.cache_data(show_spinner=False)
+def _service_counts(df_prestadores: pd.DataFrame) -> pd.Series:
+    """
+    Conteo de prestadores por servicio (cacheado).
+
+    Una sola pasada sobre el dataset alimenta el número de servicios únicos,
+    el top 10 y los conteos por servicio recomendado del panel de debug.
+    """
+    return df_prestadores["servicio_prestador"].value_counts()
 
 
 def show_recommendation_debug_info(
@@ -28,6 +45,9 @@ def show_recommendation_debug_info(
     """
     Muestra un panel consolidado de información técnica del sistema de recomendación.
 
+    No hace nada si `DEBUG_ENABLED` es falso, de modo que en producción no se
+    calculan conteos ni tablas sobre el dataset completo.
+
     Parameters
     ----------
     categoria : str
@@ -57,6 +77,9 @@ def show_recommendation_debug_info(
     expanded : bool, optional
         Si el expander debe estar expandido por defecto (default: False).
     """
+    if not DEBUG_ENABLED:
+        return
+
     with st.expander("🔍 DEBUG: Información técnica del sistema", expanded=expanded):
         # Sección 1: Datos de entrada
         st.markdown("### 1️⃣ Datos de entrada")
@@ -87,15 +110,11 @@ def show_recommendation_debug_info(
         # Sección 4: Datos de prestadores
         st.markdown("---")
         st.markdown("### 4️⃣ Datos de prestadores cargados")
+        service_counts = _service_counts(df_prestadores)
         st.write(f"**Total prestadores:** {len(df_prestadores)}")
-        st.write(
-            "**Servicios únicos:**", df_prestadores["servicio_prestador"].nunique()
-        )
+        st.write("**Servicios únicos:**", len(service_counts))
         st.write("**Top 10 servicios más comunes:**")
-        st.dataframe(
-            df_prestadores["servicio_prestador"].value_counts().head(10),
-            use_container_width=True,
-        )
+        st.dataframe(service_counts.head(10), use_container_width=True)
 
         # Sección 5: Resultado del filtrado
         st.markdown("---")
@@ -108,7 +127,5 @@ def show_recommendation_debug_info(
             st.warning("No se encontraron prestadores después del filtrado")
             st.write("**Verificando disponibilidad de servicios en dataset completo:**")
             for servicio in servicios_recomendados:
-                count = len(
-                    df_prestadores[df_prestadores["servicio_prestador"] == servicio]
-                )
+                count = service_counts.get(servicio, 0)
                 st.write(f"  - {servicio}: {count} prestadores")
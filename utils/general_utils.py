@@ -1,7 +1,13 @@
 import unicodedata
 import re
+from functools import lru_cache
+
 import pandas as pd
 
+# Compiled once and reused by every text_cleaning call
+_RE_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+_RE_WS = re.compile(r"\s+")
+
 
 def text_cleaning(text):
     """
@@ -13,6 +19,7 @@ def text_cleaning(text):
 
     Returns:
         str: Cleaned text with underscores instead of spaces, or original value if NaN.
+        Results for strings are memoized (see `_text_cleaning_str`).
 
     Example:
         >>> text_cleaning("Héllo Wórld!")
@@ -20,28 +27,34 @@ def text_cleaning(text):
         >>> text_cleaning("Médico Cirugía")
         'medico_cirugia'
     """
+    if isinstance(text, str):
+        return _text_cleaning_str(text)
+
     if pd.isna(text):
         return text
 
     # Convert to string if necessary
-    text = str(text)
+    return _text_cleaning_str(str(text))
 
+
+@lru_cache(maxsize=2048)
+def _text_cleaning_str(text: str) -> str:
+    """Cached implementation of `text_cleaning` for string inputs."""
     # Convert to lowercase
     text = text.lower()
 
-    # Remove accents and diacritics using NFD normalization
-    text = unicodedata.normalize("NFD", text)
-    text = "".join(char for char in text if unicodedata.category(char) != "Mn")
-
-    # Alternative method for stubborn accents (NFKD + ASCII encoding)
-    text = unicodedata.normalize("NFKD", text)
-    text = text.encode("ascii", errors="ignore").decode("utf-8")
+    # Remove accents and diacritics: NFKD splits them into combining marks
+    # (and folds compatibility characters), which the ASCII encoding drops.
+    # Pure ASCII text has nothing to remove, so it skips this step
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = text.encode("ascii", errors="ignore").decode("ascii")
 
     # Remove special characters (keep only letters, numbers, and spaces)
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    text = _RE_NON_ALNUM.sub(" ", text)
 
     # Remove multiple spaces
-    text = re.sub(r"\s+", " ", text)
+    text = _RE_WS.sub(" ", text)
 
     # Strip leading and trailing spaces
     text = text.strip()
@@ -30,7 +30,6 @@ else:
     PROVIDERS_URG_PATH = REMOTE_PROVIDERS_URG_PATH
 
 
-@st.cache_data(show_spinner=False)
 def clean_providers_data(
     df: pd.DataFrame,
     servicios_prestadores: Optional[List[str]] = None,
@@ -114,69 +113,98 @@ def clean_providers_data(
             "consulta_cirujano_general",
         ]
 
-    # Create a copy to avoid modifying the original
-    df_clean = df.copy()
+    # Shallow copy so renaming the columns does not touch the original; the
+    # data itself is only copied by the row filter below (surviving rows only)
+    df_clean = df.copy(deep=False)
 
     # --- Step 1: Normalize column names ---
-    df_clean.columns = [
-        c.lower()
-        .replace(" ", "_")
-        .replace(".", "")
-        .replace("/", "_")
-        .replace("__", "_")
-        for c in df_clean.columns
-    ]
+    # Dots are removed, spaces and slashes become underscores and runs of
+    # underscores collapse into one
+    df_clean.columns = (
+        pd.Index(df_clean.columns)
+        .str.lower()
+        .str.replace(".", "", regex=False)
+        .str.replace(r"[ /]", "_", regex=True)
+        .str.replace(r"_+", "_", regex=True)
+    )
 
     if verbose:
         print(f"✓ {df_clean.shape[0]} registros iniciales cargados")
 
-    # --- Step 2: Remove blacklisted providers and null values ---
-    df_clean = df_clean[
-        df_clean["prestador"].notnull()
-        & ~df_clean["prestador"].isin(prestadores_to_drop)
+    # Only these columns are used below (concepto_factura becomes
+    # servicio_prestador in step 5); the rest are dropped in the row filter
+    columnas_necesarias = [
+        "prestador",
+        "sucursal_prestador",
+        "departamento",
+        "municipio",
+        "direccion_domicilio",
+        "valor_latitud",
+        "valor_longitud",
+        "concepto_factura",
+        "direccionamiento",
+        "horario_habil",
+        "telefono",
+        "telefono_celular",
     ]
+
+    # Steps 2-4 build one combined mask and slice the DataFrame once (rows
+    # and columns together); the verbose counts come from the partial masks
+    # --- Step 2: Remove blacklisted providers and null values ---
+    mask = df_clean["prestador"].notnull() & ~df_clean["prestador"].isin(
+        prestadores_to_drop
+    )
     if verbose:
-        print(
-            f"✓ {df_clean.shape[0]} registros después de eliminar prestadores no válidos"
-        )
+        print(f"✓ {mask.sum()} registros después de eliminar prestadores no válidos")
 
     # --- Step 3: Filter out direccionamiento == 9 ---
-    df_clean = df_clean[df_clean["direccionamiento"] != 9]
+    mask &= df_clean["direccionamiento"] != 9
     if verbose:
-        print(
-            f"✓ {df_clean.shape[0]} registros después de filtrar direccionamiento != 9"
-        )
+        print(f"✓ {mask.sum()} registros después de filtrar direccionamiento != 9")
 
     # --- Step 4: Remove providers with missing/zero coordinates ---
-    df_clean = df_clean[
+    mask &= (
         df_clean["valor_latitud"].notnull()
         & df_clean["valor_longitud"].notnull()
         & (df_clean["valor_latitud"] != 0)
         & (df_clean["valor_longitud"] != 0)
-    ]
+    )
+    df_clean = df_clean.loc[mask, columnas_necesarias]
     if verbose:
         print(
             f"✓ {df_clean.shape[0]} registros después de eliminar coordenadas inválidas"
         )
 
     # --- Step 5: Apply text cleaning to service names ---
-    df_clean["servicio_prestador"] = df_clean["concepto_factura"].apply(text_cleaning)
+    # Service names repeat a lot: clean each distinct value once and map it
+    # (missing values map to NaN, as text_cleaning would return them)
+    conceptos = df_clean["concepto_factura"]
+    servicios_lut = {c: text_cleaning(c) for c in conceptos.dropna().unique()}
+    df_clean["servicio_prestador"] = conceptos.map(servicios_lut)
 
     # --- Step 6: Filter by allowed service types ---
+    # As a categorical over the allowed services, the filter and the rename
+    # below work on integer codes and on the few categories, not on every row
+    df_clean["servicio_prestador"] = df_clean["servicio_prestador"].astype(
+        pd.CategoricalDtype(list(dict.fromkeys(servicios_prestadores)))
+    )
     df_clean = df_clean[df_clean["servicio_prestador"].isin(servicios_prestadores)]
 
     # --- step 6.5: Rename specific service names for downstream processing ---
-    df_clean["servicio_prestador"] = df_clean["servicio_prestador"].replace(
-        {
-            "consulta_medicina_fisica_y_de_deporte_l": "consulta_deportologia",
-            "consulta_prioritaria_odontologia_l": "consulta_prioritaria_odontologia",
-            "urgencias_odontologia_l": "urgencias_odontologia",
-            "consulta_prioritaria_de_oftalmologia_l": "consulta_prioritaria_oftalmologia",
-            "consulta_medicin_interna_telemedicina_l": "consulta_medicina_interna_telemedicina",
-            "consulta_dermatologia_telemedicina_l": "consulta_dermatologia_telemedicina",
-            "consulta_no_programada": "consulta_medicina_general",
-            "consulta_cirujano_general": "consulta_cirugia_general",
-        }
+    servicios_renombrados = {
+        "consulta_medicina_fisica_y_de_deporte_l": "consulta_deportologia",
+        "consulta_prioritaria_odontologia_l": "consulta_prioritaria_odontologia",
+        "urgencias_odontologia_l": "urgencias_odontologia",
+        "consulta_prioritaria_de_oftalmologia_l": "consulta_prioritaria_oftalmologia",
+        "consulta_medicin_interna_telemedicina_l": "consulta_medicina_interna_telemedicina",
+        "consulta_dermatologia_telemedicina_l": "consulta_dermatologia_telemedicina",
+        "consulta_no_programada": "consulta_medicina_general",
+        "consulta_cirujano_general": "consulta_cirugia_general",
+    }
+    df_clean["servicio_prestador"] = (
+        df_clean["servicio_prestador"]
+        .cat.remove_unused_categories()
+        .map(lambda servicio: servicios_renombrados.get(servicio, servicio))
     )
 
     # Final message always shown
@@ -187,38 +215,67 @@ def clean_providers_data(
     df_clean["municipio"] = df_clean["municipio"].str.title()
 
     # --- Step 8: Select and rename columns ---
-    df_clean = df_clean[
-        [
-            "prestador",
-            "sucursal_prestador",
-            "departamento",
-            "municipio",
-            "direccion_domicilio",
-            "valor_latitud",
-            "valor_longitud",
-            "servicio_prestador",
-            "direccionamiento",
-            "horario_habil",
-            "telefono",
-            "telefono_celular",
-        ]
+    # (original name, final name) pairs: one column selection, then only the
+    # labels are replaced (no second copy of the data for the rename)
+    columnas_finales = [
+        ("prestador", "prestador"),
+        ("sucursal_prestador", "sucursal"),
+        ("departamento", "departamento"),
+        ("municipio", "municipio"),
+        ("direccion_domicilio", "direccion"),
+        ("valor_latitud", "lat"),
+        ("valor_longitud", "lng"),
+        ("servicio_prestador", "servicio_prestador"),
+        ("direccionamiento", "prioridad_recomendacion"),
+        ("horario_habil", "horario"),
+        ("telefono", "telefono_fijo"),
+        ("telefono_celular", "telefono_celular"),
     ]
-
-    df_clean = df_clean.rename(
-        columns={
-            "sucursal_prestador": "sucursal",
-            "direccion_domicilio": "direccion",
-            "valor_latitud": "lat",
-            "valor_longitud": "lng",
-            "direccionamiento": "prioridad_recomendacion",
-            "horario_habil": "horario",
-            "telefono": "telefono_fijo",
-        }
-    )
+    df_clean = df_clean[[original for original, _ in columnas_finales]]
+    df_clean.columns = [final for _, final in columnas_finales]
 
     return df_clean
 
 
+@st.cache_data(show_spinner=False, ttl=3600)
+def load_clean_providers_data(
+    path: str,
+    servicios_prestadores: Optional[List[str]] = None,
+    prestadores_to_drop: Optional[List[str]] = None,
+    verbose: bool = True,
+) -> pd.DataFrame:
+    """
+    Read a provider Excel file and clean it with `clean_providers_data`.
+
+    Cached by path, so Streamlit hashes a short string instead of the raw
+    DataFrame to look up the result. Cache expires after 1 hour (ttl=3600),
+    like `load_and_prepare_provider_data`.
+
+    Parameters
+    ----------
+    path : str
+        Path or URL of the provider Excel file (e.g., PROVIDERS_GENERAL_PATH).
+    servicios_prestadores : list of str, optional
+        Allowed service names, passed to `clean_providers_data`.
+    prestadores_to_drop : list of str, optional
+        Provider names to exclude, passed to `clean_providers_data`.
+    verbose : bool, optional
+        If True, print progress messages during cleaning (default: True).
+
+    Returns
+    -------
+    pd.DataFrame
+        Cleaned provider data (see `clean_providers_data`).
+    """
+    df = pd.read_excel(path)
+    return clean_providers_data(
+        df,
+        servicios_prestadores=servicios_prestadores,
+        prestadores_to_drop=prestadores_to_drop,
+        verbose=verbose,
+    )
+
+
 def merge_provider_locations(
     df_main: pd.DataFrame,
     df_urg: pd.DataFrame,
@@ -236,7 +293,8 @@ def merge_provider_locations(
     The merge strategy:
     1. Extract unique key-location mappings from df_urg based on composite key
     2. For each unique key combination, use the first occurrence's location data
-    3. Update matching providers in df_main with the new location data
+    3. Left-join df_main on the key and update matching providers with the new
+       location data (one vectorized pass instead of a mask per key)
 
     Parameters
     ----------
@@ -275,7 +333,7 @@ def merge_provider_locations(
 
     Notes
     -----
-    - The function creates a copy of df_main to avoid modifying the original
+    - The function does not modify df_main (updated columns are replaced on a shallow copy)
     - If a key combination appears multiple times in df_urg, only the first occurrence is used
     - Only providers matching all key columns will be updated
     - Prints summary statistics about the merge operation
@@ -287,8 +345,9 @@ def merge_provider_locations(
     if location_columns is None:
         location_columns = ["direccion", "lat", "lng"]
 
-    # Create a copy to avoid modifying original
-    df_merged = df_main.copy()
+    # Shallow copy: location columns are replaced below, never written in
+    # place, so the original is left untouched without a full deep copy
+    df_merged = df_main.copy(deep=False)
 
     # Extract unique key-location mappings from urgent care data
     # drop_duplicates with keep='first' ensures we use the first occurrence
@@ -301,26 +360,24 @@ def merge_provider_locations(
             f"📍 Encontradas {len(urg_locations)} combinaciones únicas ({', '.join(key_columns)}) en datos de urgencias"
         )
 
+    # Keys with missing values never matched row by row (NaN != NaN), while
+    # a merge would pair them; drop them so the result is the same
+    urg_locations = urg_locations.dropna(subset=key_columns)
+
+    # Single left join on the composite key (keys are unique in urg_locations,
+    # so the result has one row per provider, in the same order)
+    joined = df_merged[key_columns].merge(
+        urg_locations, on=key_columns, how="left", indicator=True
+    )
+    matched = (joined["_merge"] == "both").to_numpy()
+
+    # Update location columns for all matching rows
+    for col in location_columns:
+        df_merged[col] = df_merged[col].mask(matched, joined[col].to_numpy())
+
     # Track updates
-    updates_count = 0
-    providers_updated = []
-
-    # Update main dataset with location data from urgent care
-    for _, urg_row in urg_locations.iterrows():
-        # Build composite key mask by checking all key columns match
-        mask = pd.Series([True] * len(df_merged), index=df_merged.index)
-        for key_col in key_columns:
-            mask &= df_merged[key_col] == urg_row[key_col]
-
-        if mask.any():
-            # Update location columns for all matching rows
-            for col in location_columns:
-                df_merged.loc[mask, col] = urg_row[col]
-
-            updates_count += mask.sum()
-            # Store key combination for logging
-            key_values = tuple(urg_row[key_col] for key_col in key_columns)
-            providers_updated.append(key_values)
+    updates_count = int(matched.sum())
+    providers_updated = joined.loc[matched, key_columns].drop_duplicates()
 
     # Final message always shown
     print(
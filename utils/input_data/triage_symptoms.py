@@ -1,10 +1,10 @@
 import pandas as pd
 import os
-from typing import Dict, List, Optional
+import time
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
 import streamlit as st
 
 from utils.general_utils import text_cleaning
-import numpy as np
 
 # Default path to the triage symptoms Excel file
 LOCAL_SYMPTOMS_PATH = "data/triage_sintomas.xlsx"
@@ -24,8 +24,93 @@ DEFAULT_EXCEL_PATH = SYMPTOMS_DATA_PATH
 # Global variable to store the loaded data
 _SINTOMAS_TRIAGE: Optional[Dict[str, Dict[str, List[str]]]] = None
 
+# Valid (categoria, sintoma, modificador) triples, built from _SINTOMAS_TRIAGE
+_VALID_COMBINATIONS: Optional[FrozenSet[Tuple[str, str, str]]] = None
+
+
+class _SortedLookups(NamedTuple):
+    """Precomputed views of _SINTOMAS_TRIAGE used by the lookup helpers."""
+
+    categorias: List[str]
+    sintomas_por_categoria: Dict[str, List[str]]
+    all_sintomas: List[str]
+    # (sintoma.lower(), categoria, sintoma) in data order, for search_sintomas
+    search_index: List[Tuple[str, str, str]]
+
+
+# Sorted lookups, built from _SINTOMAS_TRIAGE
+_SORTED_LOOKUPS: Optional[_SortedLookups] = None
+
+
+def _excel_file_version(excel_path: str) -> float:
+    """
+    Version of the triage Excel used as part of the parse cache key.
+
+    Local files use their modification time. Remote files cannot be checked
+    without downloading them, so they get a new version every hour.
+    """
+    if excel_path.startswith("http"):
+        return float(int(time.time() // 3600))
+    return os.path.getmtime(excel_path)
+
+
+@st.cache_data(persist="disk", max_entries=8, show_spinner=False)
+def _parse_sintomas_excel(
+    excel_path: str,
+    col_categoria: int,
+    col_sintoma: int,
+    col_modificador: int,
+    file_version: float,
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Disk-persisted parse of the triage Excel (see `load_sintomas_from_excel`).
+
+    `file_version` is only part of the cache key. Errors propagate, so they
+    are not persisted.
+    """
+    try:
+        # Read only the three needed columns (usecols returns them in file order)
+        columnas = sorted({col_categoria, col_sintoma, col_modificador})
+        out_of_range = f"Column indices {columnas} are out of range for this file."
+        try:
+            df = pd.read_excel(excel_path, usecols=columnas)
+        except pd.errors.ParserError as e:
+            # pandas >= 2 rejects out-of-bounds indices in usecols
+            raise ValueError(out_of_range) from e
+
+        # Validate column indices (pandas < 2 only warns and drops them)
+        if len(df.columns) != len(columnas):
+            raise ValueError(out_of_range)
+
+        # Extract relevant columns
+        posicion = {col: i for i, col in enumerate(columnas)}
+        data_triage = pd.DataFrame(
+            {
+                "categoria": df.iloc[:, posicion[col_categoria]],
+                "sintoma": df.iloc[:, posicion[col_sintoma]],
+                "modificador": df.iloc[:, posicion[col_modificador]],
+            }
+        )
+
+        # Skip rows where categoria or sintoma is NaN
+        data_triage = data_triage.dropna(subset=["categoria", "sintoma"])
+
+        # Unique modificadores per (categoria, sintoma), in first-seen order
+        modificadores = data_triage.groupby(["categoria", "sintoma"], sort=False)[
+            "modificador"
+        ].apply(lambda mods: list(dict.fromkeys(mods.dropna())))
+
+        # Build nested dictionary
+        sintomas_dict = {}
+        for (cat, sint), mods in modificadores.items():
+            sintomas_dict.setdefault(cat, {})[sint] = mods
+
+        return sintomas_dict
+
+    except Exception as e:
+        raise RuntimeError(f"Error loading Excel file '{excel_path}': {str(e)}")
+
 
-@st.cache_data(show_spinner=False)
 def load_sintomas_from_excel(
     excel_path: str = DEFAULT_EXCEL_PATH,
     col_categoria: int = 7,
@@ -36,7 +121,11 @@ def load_sintomas_from_excel(
     Load triage symptoms data from an Excel file and build nested dictionary.
 
     This function reads columns from an Excel file and creates a three-level
-    hierarchical structure: Category -> Symptom -> Modifiers.
+    hierarchical structure: Category -> Symptom -> Modifiers. The parsed
+    dict is persisted to disk keyed on the file version (see
+    `_excel_file_version`), so new processes load the pickled dict instead of
+    parsing the Excel file again, and an edited file is read again. The
+    module-level data used by the helper functions is always updated.
 
     Parameters
     ----------
@@ -73,90 +162,108 @@ def load_sintomas_from_excel(
     >>> # Load with different column indices
     >>> data = load_sintomas_from_excel(col_categoria=5, col_sintoma=6, col_modificador=7)
     """
-    global _SINTOMAS_TRIAGE
+    global _SINTOMAS_TRIAGE, _VALID_COMBINATIONS, _SORTED_LOOKUPS
 
     # Check if file exists (only for local files)
     if not excel_path.startswith("http") and not os.path.exists(excel_path):
         raise FileNotFoundError(f"Excel file not found: {excel_path}")
 
-    try:
-        # Read Excel file
-        df = pd.read_excel(excel_path)
-
-        # Validate column indices
-        if col_categoria >= len(df.columns):
-            raise ValueError(
-                f"Column index {col_categoria} is out of range. File has {len(df.columns)} columns."
-            )
-        if col_sintoma >= len(df.columns):
-            raise ValueError(
-                f"Column index {col_sintoma} is out of range. File has {len(df.columns)} columns."
-            )
-        if col_modificador >= len(df.columns):
-            raise ValueError(
-                f"Column index {col_modificador} is out of range. File has {len(df.columns)} columns."
-            )
+    sintomas_dict = _parse_sintomas_excel(
+        excel_path,
+        col_categoria,
+        col_sintoma,
+        col_modificador,
+        _excel_file_version(excel_path),
+    )
 
-        # Extract relevant columns
-        data_triage = pd.DataFrame(
-            {
-                "categoria": df.iloc[:, col_categoria],
-                "sintoma": df.iloc[:, col_sintoma],
-                "modificador": df.iloc[:, col_modificador],
-            }
-        )
+    # Update global variables outside the cached parse, so they are also set
+    # on a cache hit (derived lookups are rebuilt on next use)
+    _SINTOMAS_TRIAGE = sintomas_dict
+    _VALID_COMBINATIONS = None
+    _SORTED_LOOKUPS = None
 
-        # Remove rows where all values are NaN
-        data_triage = data_triage.dropna(how="all")
+    return sintomas_dict
 
-        # Build nested dictionary
-        sintomas_dict = {}
 
-        for _, row in data_triage.iterrows():
-            cat = row["categoria"]
-            sint = row["sintoma"]
-            mod = row["modificador"]
+def _get_sintomas_data() -> Dict[str, Dict[str, List[str]]]:
+    """
+    Get the sintomas data, loading it if necessary.
 
-            # Skip if categoria or sintoma is NaN
-            if pd.isna(cat) or pd.isna(sint):
-                continue
+    Returns
+    -------
+    dict
+        The sintomas triage dictionary.
+    """
+    if _SINTOMAS_TRIAGE is None:
+        # The loader also sets _SINTOMAS_TRIAGE
+        load_sintomas_from_excel()
 
-            # Initialize categoria if not exists
-            if cat not in sintomas_dict:
-                sintomas_dict[cat] = {}
+    return _SINTOMAS_TRIAGE
 
-            # Initialize sintoma if not exists
-            if sint not in sintomas_dict[cat]:
-                sintomas_dict[cat][sint] = []
 
-            # Add modificador if not NaN and not already in list
-            if not pd.isna(mod) and mod not in sintomas_dict[cat][sint]:
-                sintomas_dict[cat][sint].append(mod)
+def _get_valid_combinations() -> FrozenSet[Tuple[str, str, str]]:
+    """
+    Get the set of valid (categoria, sintoma, modificador) triples.
 
-        # Update global variable
-        _SINTOMAS_TRIAGE = sintomas_dict
+    Built once from the sintomas data so `validate_selection` is a single
+    set lookup.
 
-        return sintomas_dict
+    Returns
+    -------
+    frozenset
+        All valid combinations.
+    """
+    global _VALID_COMBINATIONS
+
+    if _VALID_COMBINATIONS is None:
+        _VALID_COMBINATIONS = frozenset(
+            (categoria, sintoma, modificador)
+            for categoria, sintomas in _get_sintomas_data().items()
+            for sintoma, modificadores in sintomas.items()
+            for modificador in modificadores
+        )
 
-    except Exception as e:
-        raise RuntimeError(f"Error loading Excel file '{excel_path}': {str(e)}")
+    return _VALID_COMBINATIONS
 
 
-def _get_sintomas_data() -> Dict[str, Dict[str, List[str]]]:
+def _get_sorted_lookups() -> _SortedLookups:
     """
-    Get the sintomas data, loading it if necessary.
+    Get the pre-sorted category and sintoma lists and the search index.
+
+    Built once from the sintomas data so the dropdown helpers, which run on
+    every rerun, only read an attribute.
 
     Returns
     -------
-    dict
-        The sintomas triage dictionary.
+    _SortedLookups
+        Sorted categories, sorted sintomas per category, all sintomas and the
+        lowercased search index.
     """
-    global _SINTOMAS_TRIAGE
-
-    if _SINTOMAS_TRIAGE is None:
-        load_sintomas_from_excel()
+    global _SORTED_LOOKUPS
+
+    if _SORTED_LOOKUPS is None:
+        sintomas_triage = _get_sintomas_data()
+        _SORTED_LOOKUPS = _SortedLookups(
+            categorias=sorted(sintomas_triage),
+            sintomas_por_categoria={
+                categoria: sorted(sintomas)
+                for categoria, sintomas in sintomas_triage.items()
+            },
+            all_sintomas=sorted(
+                {
+                    sintoma
+                    for sintomas in sintomas_triage.values()
+                    for sintoma in sintomas
+                }
+            ),
+            search_index=[
+                (sintoma.lower(), categoria, sintoma)
+                for categoria, sintomas in sintomas_triage.items()
+                for sintoma in sintomas
+            ],
+        )
 
-    return _SINTOMAS_TRIAGE
+    return _SORTED_LOOKUPS
 
 
 # === Helper Functions ===
@@ -177,8 +284,7 @@ def get_categorias():
     >>> print(categorias[0])
     'Boca, garganta y cuello'
     """
-    sintomas_triage = _get_sintomas_data()
-    return sorted(list(sintomas_triage.keys()))
+    return _get_sorted_lookups().categorias
 
 
 def get_sintomas(categoria):
@@ -202,10 +308,7 @@ def get_sintomas(categoria):
     >>> print(sintomas)
     ['Dificultad para tragar (ej: se me atora la comida)', 'Golpe o trauma en la boca']
     """
-    sintomas_triage = _get_sintomas_data()
-    if categoria not in sintomas_triage:
-        return []
-    return sorted(list(sintomas_triage[categoria].keys()))
+    return _get_sorted_lookups().sintomas_por_categoria.get(categoria, [])
 
 
 def get_modificadores(categoria, sintoma):
@@ -231,12 +334,7 @@ def get_modificadores(categoria, sintoma):
     >>> print(len(mods))
     8
     """
-    sintomas_triage = _get_sintomas_data()
-    if categoria not in sintomas_triage:
-        return []
-    if sintoma not in sintomas_triage[categoria]:
-        return []
-    return sintomas_triage[categoria][sintoma]
+    return _get_sintomas_data().get(categoria, {}).get(sintoma, [])
 
 
 def get_all_sintomas_flat():
@@ -254,11 +352,7 @@ def get_all_sintomas_flat():
     >>> print(len(all_sintomas))
     93
     """
-    sintomas_triage = _get_sintomas_data()
-    sintomas_set = set()
-    for categoria in sintomas_triage.values():
-        sintomas_set.update(categoria.keys())
-    return sorted(list(sintomas_set))
+    return _get_sorted_lookups().all_sintomas
 
 
 def search_sintomas(keyword):
@@ -282,16 +376,12 @@ def search_sintomas(keyword):
     >>> for cat, sints in results.items():
     ...     print(f"{cat}: {len(sints)} matches")
     """
-    sintomas_triage = _get_sintomas_data()
     keyword_lower = keyword.lower()
     results = {}
 
-    for categoria, sintomas in sintomas_triage.items():
-        matching_sintomas = [
-            sintoma for sintoma in sintomas.keys() if keyword_lower in sintoma.lower()
-        ]
-        if matching_sintomas:
-            results[categoria] = matching_sintomas
+    for sintoma_lower, categoria, sintoma in _get_sorted_lookups().search_index:
+        if keyword_lower in sintoma_lower:
+            results.setdefault(categoria, []).append(sintoma)
 
     return results
 
@@ -324,12 +414,7 @@ def validate_selection(categoria, sintoma, modificador):
     >>> print(is_valid)
     True
     """
-    sintomas_triage = _get_sintomas_data()
-    if categoria not in sintomas_triage:
-        return False
-    if sintoma not in sintomas_triage[categoria]:
-        return False
-    return modificador in sintomas_triage[categoria][sintoma]
+    return (categoria, sintoma, modificador) in _get_valid_combinations()
 
 
 def get_triage_summary():
@@ -375,6 +460,24 @@ def get_triage_summary():
     }
 
 
+@st.cache_data(show_spinner=False)
+def _read_triage_excel(excel_path: str) -> pd.DataFrame:
+    """
+    Read the raw triage Excel once per path (cached across reruns and sessions).
+
+    Parameters
+    ----------
+    excel_path : str
+        Path or URL of the triage Excel file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The raw sheet, without any column normalization.
+    """
+    return pd.read_excel(excel_path)
+
+
 def get_triage_decision(
     categoria: str, sintoma: str, modificador: str, excel_path: str = DEFAULT_EXCEL_PATH
 ) -> Optional[Dict[str, str]]:
@@ -428,8 +531,8 @@ def get_triage_decision(
         return None
 
     try:
-        # Read Excel file
-        df = pd.read_excel(excel_path)
+        # Read Excel file (cached, the file is only parsed on the first call)
+        df = _read_triage_excel(excel_path)
 
         # Column indices (0-based)
         COL_CATEGORIA = 7
@@ -5,6 +5,7 @@ This module handles the complete workflow of recommending healthcare providers
 based on user triage results and location.
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from typing import Optional, Dict, List
@@ -18,12 +19,10 @@ from utils.matching_utils.triage_matching import (
 from utils.input_data.providers_utils import (
     PROVIDERS_GENERAL_PATH,
     PROVIDERS_URG_PATH,
-    clean_providers_data,
+    load_clean_providers_data,
     merge_provider_locations,
 )
 
-from utils.general_utils import text_cleaning
-
 
 @st.cache_data(show_spinner=False, ttl=3600)
 def load_and_prepare_provider_data(
@@ -34,7 +33,9 @@ def load_and_prepare_provider_data(
     Load, clean, and merge provider datasets.
 
     This function is cached to avoid reloading data on every rerun.
-    Cache expires after 1 hour (ttl=3600).
+    Cache expires after 1 hour (ttl=3600). The low-cardinality text columns
+    (service, department, municipality) are stored as `category` dtype, which
+    shrinks the cached frame and turns equality filters into code compares.
 
     Parameters
     ----------
@@ -48,23 +49,128 @@ def load_and_prepare_provider_data(
     pd.DataFrame
         Cleaned and merged provider dataset with standardized columns.
     """
-    # Load raw data
-    df_prestadores = pd.read_excel(path_prestadores)
-    df_prestadores_urg = pd.read_excel(path_prestadores_urg)
-
-    # Clean both datasets
-    prestadores_clean = clean_providers_data(df_prestadores, verbose=False)
-    prestadores_urg_clean = clean_providers_data(df_prestadores_urg, verbose=False)
+    # Load and clean both datasets (cached by path)
+    prestadores_clean = load_clean_providers_data(path_prestadores, verbose=False)
+    prestadores_urg_clean = load_clean_providers_data(
+        path_prestadores_urg, verbose=False
+    )
 
     # Merge location data from urgent care
     prestadores_final = merge_provider_locations(
         prestadores_clean, prestadores_urg_clean, verbose=False
     )
 
+    for col in ("servicio_prestador", "departamento", "municipio"):
+        if col in prestadores_final.columns:
+            prestadores_final[col] = prestadores_final[col].astype("category")
+
     return prestadores_final
 
 
 @st.cache_data(show_spinner=False, ttl=3600)
+def _provider_data_version(
+    path_prestadores: str = PROVIDERS_GENERAL_PATH,
+    path_prestadores_urg: str = PROVIDERS_URG_PATH,
+) -> int:
+    """
+    Content hash of the prepared provider data.
+
+    Used as a cache key for data derived from the providers, so it changes
+    when `load_and_prepare_provider_data` reloads different data. Recomputed
+    at most once per hour (ttl=3600), like the provider data itself.
+    """
+    df = load_and_prepare_provider_data(path_prestadores, path_prestadores_urg)
+    return int(pd.util.hash_pandas_object(df, index=False).sum())
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _triage_data_version(path_triage: str = SYMPTOMS_DATA_PATH) -> int:
+    """
+    Content hash of the triage combinations read from the triage Excel.
+
+    Used as a cache key next to `_provider_data_version`, so an edited
+    triage file rebuilds the correspondence table. Recomputed at most once
+    per hour (ttl=3600).
+    """
+    df_triage = build_triage_combinations(path_triage)
+    return int(pd.util.hash_pandas_object(df_triage, index=False).sum())
+
+
+@st.cache_data(
+    persist="disk",
+    max_entries=8,
+    show_spinner="🔄 Cargando sistema de recomendación...",
+)
+def _build_triage_correspondence_table_persisted(
+    path_triage: str,
+    path_prestadores: str,
+    path_prestadores_urg: str,
+    threshold: float,
+    top_k: int,
+    method: str,
+    triage_data_version: int,
+    provider_data_version: int,
+) -> pd.DataFrame:
+    """
+    Disk-persisted build of the correspondence table.
+
+    The result is deterministic for a given set of arguments and input data,
+    so it is stored on disk and survives process restarts (redeploys) without
+    re-running the semantic matching. `triage_data_version` and
+    `provider_data_version` are only part of the cache key: disk persistence
+    ignores ttl, so new input data must produce a new key. See
+    `build_triage_correspondence_table`.
+    """
+    # Build triage combinations
+    df_triage = build_triage_combinations(path_triage)
+
+    # Load and prepare provider data
+    prestadores_final = load_and_prepare_provider_data(
+        path_prestadores, path_prestadores_urg
+    )
+
+    # Build correspondence table
+    df_corr = build_correspondence_table(
+        df_sintomas=df_triage,
+        df_prestadores=prestadores_final,
+        threshold=threshold,
+        top_k=top_k,
+        method=method,
+        verbose=False,
+    )
+
+    return df_corr
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _get_triage_correspondence_table_shared(
+    path_triage: str,
+    path_prestadores: str,
+    path_prestadores_urg: str,
+    threshold: float,
+    top_k: int,
+    method: str,
+    triage_data_version: int,
+    provider_data_version: int,
+) -> pd.DataFrame:
+    """
+    In-memory layer over the persisted build, shared by reference.
+
+    One entry per argument combination and data version, so cache hits skip
+    unpickling the table. See `build_triage_correspondence_table`.
+    """
+    return _build_triage_correspondence_table_persisted(
+        path_triage,
+        path_prestadores,
+        path_prestadores_urg,
+        threshold,
+        top_k,
+        method,
+        triage_data_version,
+        provider_data_version,
+    )
+
+
 def build_triage_correspondence_table(
     path_triage: str = SYMPTOMS_DATA_PATH,
     path_prestadores: str = PROVIDERS_GENERAL_PATH,
@@ -76,8 +182,13 @@ def build_triage_correspondence_table(
     """
     Build the complete triage-to-service correspondence table.
 
-    This function is cached to avoid rebuilding the table on every rerun.
-    Cache expires after 1 hour.
+    The table is kept in memory with `st.cache_resource` and shared by
+    reference across reruns and sessions. Both cache layers are keyed on the
+    arguments and on content hashes of the triage and provider data, so the
+    table is rebuilt when either changes. The underlying build is also
+    persisted to disk, so after a restart the table is loaded instead of
+    re-running the semantic matching. Callers must treat the returned
+    DataFrame (including its list cells) as read-only.
 
     Parameters
     ----------
@@ -101,26 +212,17 @@ def build_triage_correspondence_table(
         ['categoria','nivel_triage', 'modalidad_requerida', 'especialidad_requerida',
          'servicios_sugeridos', 'scores', 'tipo_coincidencia']
     """
-    # Build triage combinations
-    df_triage = build_triage_combinations(path_triage)
-
-    # Load and prepare provider data
-    prestadores_final = load_and_prepare_provider_data(
-        path_prestadores, path_prestadores_urg
-    )
-
-    # Build correspondence table
-    df_corr = build_correspondence_table(
-        df_sintomas=df_triage,
-        df_prestadores=prestadores_final,
-        threshold=threshold,
-        top_k=top_k,
-        method=method,
-        verbose=False,
+    return _get_triage_correspondence_table_shared(
+        path_triage,
+        path_prestadores,
+        path_prestadores_urg,
+        threshold,
+        top_k,
+        method,
+        _triage_data_version(path_triage),
+        _provider_data_version(path_prestadores, path_prestadores_urg),
     )
 
-    return df_corr
-
 
 def get_recommended_services(
     categoria: str,
@@ -164,9 +266,10 @@ def get_recommended_services(
 
     if not matches.empty:
         row = matches.iloc[0]
+        # Copies: the lists are cells of the correspondence table
         return {
-            "servicios": row["servicios_sugeridos"],
-            "scores": row["scores"],
+            "servicios": list(row["servicios_sugeridos"]),
+            "scores": list(row["scores"]),
             "tipo": row["tipo_coincidencia"],
         }
     else:
@@ -185,6 +288,98 @@ def get_recommended_services(
             }
 
 
+@st.cache_resource(show_spinner=False, max_entries=4)
+def build_provider_index(
+    path_prestadores: str = PROVIDERS_GENERAL_PATH,
+    path_prestadores_urg: str = PROVIDERS_URG_PATH,
+    provider_data_version: int = 0,
+) -> Dict:
+    """
+    Build lookup structures over the provider dataset for fast filtering.
+
+    Computed once per provider data version and shared by reference: the
+    filtering in `filter_providers_by_service_and_location` then reduces to
+    dictionary lookups and index intersections instead of boolean scans over
+    the full DataFrame on every call.
+
+    Parameters
+    ----------
+    path_prestadores : str
+        Path to main providers Excel file.
+    path_prestadores_urg : str
+        Path to urgent care providers Excel file.
+    provider_data_version : int, optional
+        Only part of the cache key (see `_provider_data_version`), so the
+        index is rebuilt when the provider data is reloaded with new content.
+
+    Returns
+    -------
+    dict
+        - 'df': provider DataFrame (read-only)
+        - 'lat', 'lng': coordinate arrays (float)
+        - 'servicio': service name -> array of row positions
+        - 'ubicacion': (departamento, municipio) lowercased -> array of row positions
+    """
+    df = load_and_prepare_provider_data(path_prestadores, path_prestadores_urg)
+
+    return {
+        "df": df,
+        "lat": df["lat"].to_numpy(dtype=float),
+        "lng": df["lng"].to_numpy(dtype=float),
+        "servicio": df.groupby(
+            "servicio_prestador", sort=False, observed=True
+        ).indices,
+        "ubicacion": df.groupby(
+            [df["departamento"].str.lower(), df["municipio"].str.lower()], sort=False
+        ).indices,
+    }
+
+
+def haversine_km(
+    lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized great-circle distance from one point to many points.
+
+    Parameters
+    ----------
+    lat, lng : float
+        Reference point in decimal degrees.
+    lats, lngs : np.ndarray
+        Target coordinates in decimal degrees.
+
+    Returns
+    -------
+    np.ndarray
+        Distances in kilometers (NaN where the target coordinates are missing).
+    """
+    R = 6371.0  # Earth radius in kilometers
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+
+    # The trig chain is applied in place on two work arrays (dlat, a) instead
+    # of allocating a temporary per operation
+    dlat = lat2 - lat1
+    dlat *= 0.5
+    np.sin(dlat, out=dlat)
+    np.square(dlat, out=dlat)
+
+    a = np.radians(lngs - lng)
+    a *= 0.5
+    np.sin(a, out=a)
+    np.square(a, out=a)
+    np.cos(lat2, out=lat2)
+    a *= lat2
+    a *= np.cos(lat1)
+    a += dlat
+
+    np.sqrt(a, out=a)
+    np.minimum(a, 1.0, out=a)  # Guard arcsin against rounding above 1
+    np.arcsin(a, out=a)
+    a *= 2 * R
+    return a
+
+
 def filter_providers_by_service_and_location(
     servicios: List[str],
     departamento: str,
@@ -218,58 +413,49 @@ def filter_providers_by_service_and_location(
     pd.DataFrame
         Filtered and sorted provider dataset.
     """
-    # Normalize and title the user location inputs
-    departamento = departamento.title()
-    municipio = municipio.title()
-
-    # Load and prepare provider data
-    prestadores_final = load_and_prepare_provider_data(
-        path_prestadores, path_prestadores_urg
+    # Precomputed row indices and coordinate arrays (shared across reruns)
+    index = build_provider_index(
+        path_prestadores,
+        path_prestadores_urg,
+        _provider_data_version(path_prestadores, path_prestadores_urg),
     )
+    prestadores_final = index["df"]
 
-    # st.error(f"Total providers available: {len(prestadores_final)}")
-    # st.warning(prestadores_final["departamento"].unique())
-    # st.warning(
-    #     prestadores_final[prestadores_final["departamento"] == "Bogota D.C."][
-    #         "municipio"
-    #     ].unique()
-    # )
-
-    # Filter by service
-    filtered = prestadores_final[
-        prestadores_final["servicio_prestador"].isin(servicios)
-    ].copy()
-
-    # st.error(f"Providers after service filter: {len(filtered)}")
+    # Rows offering any of the recommended services
+    empty = np.empty(0, dtype=np.intp)
+    service_rows = np.concatenate(
+        [empty] + [index["servicio"].get(s, empty) for s in servicios]
+    )
 
-    # Filter by location (department and municipality)
-    filtered = filtered[
-        (filtered["departamento"].str.lower() == departamento.lower())
-        & (filtered["municipio"].str.lower() == municipio.lower())
-    ]
+    # Rows in the user's department and municipality (case-insensitive)
+    location_rows = index["ubicacion"].get(
+        (departamento.lower(), municipio.lower()), empty
+    )
 
-    # st.warning(f"Filtering providers in {municipio}, {departamento}")
-    # st.error(f"Providers after location filter: {len(filtered)}")
+    # Sorted positional intersection keeps the original row order
+    rows = np.intersect1d(service_rows, location_rows)
 
     # Calculate distances if user location provided
-    if user_location and len(filtered) > 0:
-        from math import radians, cos, sin, asin, sqrt
-
-        def haversine(lat1, lon1, lat2, lon2):
-            """Calculate distance between two points on Earth (km)."""
-            R = 6371  # Earth radius in kilometers
-            lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-            c = 2 * asin(sqrt(a))
-            return R * c
-
+    if user_location and len(rows) > 0:
         user_lat = user_location["lat"]
         user_lng = user_location["lng"]
+        lats = index["lat"][rows]
+        lngs = index["lng"][rows]
+
+        # Bounding-box prefilter so only rows that can be within
+        # max_distance_km go through the trig (the box is slightly larger
+        # than the circle; rows without coordinates are dropped here)
+        dlat_deg = max_distance_km / 111.0
+        cos_lat = np.cos(np.radians(min(abs(user_lat) + dlat_deg, 90.0)))
+        dlng_deg = max_distance_km / (111.0 * max(cos_lat, 1e-6))
+        in_box = (np.abs(lats - user_lat) <= dlat_deg) & (
+            np.abs(lngs - user_lng) <= dlng_deg
+        )
 
-        filtered["distancia_km"] = filtered.apply(
-            lambda row: haversine(user_lat, user_lng, row["lat"], row["lng"]), axis=1
+        rows = rows[in_box]
+        filtered = prestadores_final.iloc[rows].copy()
+        filtered["distancia_km"] = haversine_km(
+            user_lat, user_lng, lats[in_box], lngs[in_box]
         )
 
         # Filter by distance
@@ -281,6 +467,8 @@ def filter_providers_by_service_and_location(
         )
     else:
         # Sort by priority only
-        filtered = filtered.sort_values(by="prioridad_recomendacion", ascending=True)
+        filtered = prestadores_final.iloc[rows].sort_values(
+            by="prioridad_recomendacion", ascending=True
+        )
 
     return filtered
@@ -8,9 +8,12 @@ or fuzzy string matching (RapidFuzz).
 
 from typing import Tuple, List
 import streamlit as st
-from sentence_transformers import SentenceTransformer, util
 from rapidfuzz import process, fuzz
 
+# sentence_transformers (and torch) are imported inside the functions that use
+# them: this module is pulled in by the provider-data loader on the triage page,
+# which never needs the embedding model.
+
 
 # Global model cache (lazy loading)
 _SEMANTIC_MODEL = None
@@ -32,6 +35,8 @@ def load_semantic_model(model_name: str = "paraphrase-multilingual-MiniLM-L12-v2
     SentenceTransformer
         Loaded model ready for encoding.
     """
+    from sentence_transformers import SentenceTransformer
+
     global _SEMANTIC_MODEL
     if _SEMANTIC_MODEL is None:
         _SEMANTIC_MODEL = SentenceTransformer(model_name)
@@ -99,6 +104,8 @@ def semantic_match_services(
     >>> print(matched)
     ['urgencias_ortopedista', 'consulta_ortopedista']
     """
+    from sentence_transformers import util
+
     model = load_semantic_model()
 
     # Encode specialty
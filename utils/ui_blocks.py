@@ -9,6 +9,7 @@ from utils.input_data.triage_symptoms import (
     get_triage_decision,
 )
 import time
+from functools import lru_cache
 
 BUG_REPORT_URL = "https://www.sura.co/arl"
 HELP_URL = "https://www.sura.co/arl"
@@ -50,10 +51,8 @@ def menu() -> None:
     st.sidebar.markdown("---")
 
 
-def fixed_header(nombre_usuario: str, decision: str, ciudad: str):
-    """Display a custom header with user information."""
-    st.markdown(
-        f"""
+# Static part of the fixed header (formatted once at import)
+_HEADER_CSS = f"""
         <style>
         .header {{
             background-color: {SECONDARY_BLUE};
@@ -72,7 +71,14 @@ def fixed_header(nombre_usuario: str, decision: str, ciudad: str):
             font-weight: bold;
         }}
         </style>
+"""
+
 
+def fixed_header(nombre_usuario: str, decision: str, ciudad: str):
+    """Display a custom header with user information."""
+    st.markdown(
+        _HEADER_CSS
+        + f"""
         <div class="header">
             <div class="title">🏥 RutaSalud - Recomendador de Rutas</div>
             <div class="info">
@@ -86,6 +92,42 @@ def fixed_header(nombre_usuario: str, decision: str, ciudad: str):
     )
 
 
+def init_page() -> None:
+    """
+    Shared page setup: theme styles, sidebar menu and the patient header.
+
+    Every page calls this once at the top instead of repeating the
+    style/menu/header sequence. The header values are read from
+    `st.session_state` (empty until the user is identified).
+
+    Returns
+    -------
+    None
+    """
+    general_style_orch()  # Inject custom styles
+    menu()  # Setup sidebar menu
+    fixed_header(
+        st.session_state.get("identificacion_paciente", ""),
+        st.session_state.get("decision", ""),
+        st.session_state.get("ciudad", ""),
+    )
+
+
+def set_current_tab(tab_name: str) -> None:
+    """
+    Callback for the triage navigation buttons.
+
+    Used as `on_click` so the new tab is stored before the script reruns,
+    avoiding the extra execution caused by `st.rerun()`.
+
+    Parameters
+    ----------
+    tab_name : str
+        Tab to activate ("Inicio", "Formulario" or "Mapa ubicación").
+    """
+    st.session_state.current_tab_triage = tab_name
+
+
 def options_navigation_horizontal(
     current_tab: str,
     PRIMARY_BLUE: str = PRIMARY_BLUE,
@@ -153,6 +195,20 @@ def options_navigation_horizontal(
     return selected
 
 
+@lru_cache(maxsize=256)
+def _with_empty_option(items: tuple) -> tuple:
+    """Location selectbox options with the empty choice first (memoized)."""
+    return ("",) + items
+
+
+@lru_cache(maxsize=4)
+def _all_ciudades(ciudades_por_departamento: tuple) -> tuple:
+    """Sorted, de-duplicated cities across every department (memoized)."""
+    return tuple(
+        sorted({ciudad for ciudades in ciudades_por_departamento for ciudad in ciudades})
+    )
+
+
 def identification_form(ID_TYPES, SEXO_OPTIONS, DEPARTAMENTOS_CIUDADES):
     """
     Render the patient identification form for the triage process.
@@ -171,8 +227,8 @@ def identification_form(ID_TYPES, SEXO_OPTIONS, DEPARTAMENTOS_CIUDADES):
         List of valid identification document types (e.g., ["Cédula (CC)", "Pasaporte (PA)"]).
     SEXO_OPTIONS : list
         List of valid biological sex options (e.g., ["Masculino", "Femenino"]).
-    DEPARTAMENTOS_CIUDADES : dict
-        Dictionary mapping each department to its list of available cities.
+    DEPARTAMENTOS_CIUDADES : Mapping
+        Read-only mapping of each department to a tuple of its available cities.
 
     Returns
     -------
@@ -181,10 +237,8 @@ def identification_form(ID_TYPES, SEXO_OPTIONS, DEPARTAMENTOS_CIUDADES):
     """
 
     # Initialize session state variables
-    if "selected_departamento" not in st.session_state:
-        st.session_state.selected_departamento = ""
-    if "ciudad_selected" not in st.session_state:
-        st.session_state.ciudad_selected = ""
+    st.session_state.setdefault("selected_departamento", "")
+    st.session_state.setdefault("ciudad_selected", "")
 
     # ------------- FORM LAYOUT -------------
     col1, col2 = st.columns(2)
@@ -214,7 +268,7 @@ def identification_form(ID_TYPES, SEXO_OPTIONS, DEPARTAMENTOS_CIUDADES):
     # -------- RIGHT COLUMN --------
     with col2:
         ## Select departamento (con opción vacía inicial)
-        all_departamentos = [""] + list(DEPARTAMENTOS_CIUDADES.keys())
+        all_departamentos = _with_empty_option(tuple(DEPARTAMENTOS_CIUDADES))
 
         departamento_index = (
             0
@@ -236,7 +290,7 @@ def identification_form(ID_TYPES, SEXO_OPTIONS, DEPARTAMENTOS_CIUDADES):
             # Si cambia el departamento, resetear la ciudad solo si hay un departamento seleccionado
             if departamento:
                 st.session_state.ciudad_selected = ""
-            st.rerun()
+            # Sin st.rerun(): la lista de ciudades se calcula abajo con el nuevo valor
 
         ## Select city - mostrar todas las ciudades o filtrar por departamento
         if st.session_state.selected_departamento:
@@ -246,16 +300,12 @@ def identification_form(ID_TYPES, SEXO_OPTIONS, DEPARTAMENTOS_CIUDADES):
             ]
         else:
             # Si no hay departamento, mostrar TODAS las ciudades
-            ciudades_disponibles = sorted(
-                set(
-                    ciudad
-                    for ciudades in DEPARTAMENTOS_CIUDADES.values()
-                    for ciudad in ciudades
-                )
+            ciudades_disponibles = _all_ciudades(
+                tuple(DEPARTAMENTOS_CIUDADES.values())
             )
 
         # Añadir opción vacía al inicio
-        ciudades_con_vacio = [""] + ciudades_disponibles
+        ciudades_con_vacio = _with_empty_option(ciudades_disponibles)
 
         ciudad_index = (
             0
@@ -283,9 +333,12 @@ def identification_form(ID_TYPES, SEXO_OPTIONS, DEPARTAMENTOS_CIUDADES):
 
         arrow_cols = st.columns([3, 4, 3])
         with arrow_cols[1]:
-            if st.button("Seguir al Formulario →", use_container_width=True):
-                st.session_state.current_tab_triage = "Formulario"
-                st.rerun()
+            st.button(
+                "Seguir al Formulario →",
+                use_container_width=True,
+                on_click=set_current_tab,
+                args=("Formulario",),
+            )
 
     # ------------- ACTION BUTTON -------------
     st.markdown("")
@@ -328,6 +381,22 @@ def identification_form(ID_TYPES, SEXO_OPTIONS, DEPARTAMENTOS_CIUDADES):
             st.rerun()
 
 
+# First option of the symptom selectboxes (no selection)
+SELECT_PLACEHOLDER = "Seleccione una opción..."
+
+
+@lru_cache(maxsize=256)
+def _options_with_placeholder(items: tuple) -> tuple:
+    """Selectbox options for `items` with the placeholder first (memoized)."""
+    return (SELECT_PLACEHOLDER,) + items
+
+
+@lru_cache(maxsize=256)
+def _option_index(items: tuple) -> dict:
+    """Map each item to its selectbox index, accounting for the placeholder (memoized)."""
+    return {item: i + 1 for i, item in enumerate(items)}
+
+
 def symptoms_form(
     get_categorias=get_categorias,
     get_sintomas=get_sintomas,
@@ -365,122 +434,95 @@ def symptoms_form(
         False otherwise.
     """
 
+    # Session state is read once into locals and written back once the
+    # selectboxes have been rendered
+    state = st.session_state
+
     try:
         # ---------  CATEGORIES ----------------
-        categorias = get_categorias()
+        categorias = tuple(get_categorias())
+        categoria = state.get("selected_categoria")
 
         # Determine index dynamically to preserve user's previous selection
-        categoria_index = (
-            0
-            if not st.session_state.get("selected_categoria")
-            else categorias.index(st.session_state.selected_categoria) + 1
-        )
+        categoria_index = _option_index(categorias).get(categoria, 0)
 
         categoria = st.selectbox(
             "1️⃣ ¿En qué área del cuerpo se presenta el síntoma? *",
-            options=["Seleccione una opción..."] + categorias,
+            options=_options_with_placeholder(categorias),
             index=categoria_index,
             help="Seleccione la categoría que mejor describe el área afectada",
             key="categoria_select",
         )
 
-        # Update the selected category in session_state
-        if categoria != "Seleccione una opción...":
-            st.session_state.selected_categoria = categoria
+        if categoria != SELECT_PLACEHOLDER:
+            sintoma = state.get("selected_sintoma")
+            modificador = state.get("selected_modificador")
         else:
             # Reset downstream selections if user resets category
-            st.session_state.selected_categoria = None
-            st.session_state.selected_sintoma = None
-            st.session_state.selected_modificador = None
+            categoria, sintoma, modificador = None, None, None
 
         # ------------  SYMPTOMS --------------
         # Select Symptom (only shown if category is selected)
-        if st.session_state.selected_categoria:
-            sintomas = get_sintomas(st.session_state.selected_categoria)
+        if categoria:
+            sintomas = tuple(get_sintomas(categoria))
 
             # Determine index dynamically to preserve user's previous selection
-            sintoma_index = (
-                0
-                if not st.session_state.get("selected_sintoma")
-                else sintomas.index(st.session_state.selected_sintoma) + 1
-            )
+            sintoma_index = _option_index(sintomas).get(sintoma, 0)
 
             sintoma = st.selectbox(
                 "2️⃣ ¿Cuál de los siguientes síntomas te identifica mejor? *",
-                options=["Seleccione una opción..."] + sintomas,
+                options=_options_with_placeholder(sintomas),
                 index=sintoma_index,
                 help="Seleccione el síntoma específico que presenta",
                 key="sintoma_select",
             )
 
-            if sintoma != "Seleccione una opción...":
-                st.session_state.selected_sintoma = sintoma
-            else:
+            if sintoma == SELECT_PLACEHOLDER:
                 # Reset next step if symptom is deselected
-                st.session_state.selected_sintoma = None
-                st.session_state.selected_modificador = None
+                sintoma, modificador = None, None
 
         # ------------  MODIFIERS --------------
         # Select Modifier (only shown if symptom is selected)
-        if st.session_state.get("selected_sintoma"):
-            modificadores = get_modificadores(
-                st.session_state.selected_categoria, st.session_state.selected_sintoma
-            )
+        if sintoma:
+            modificadores = tuple(get_modificadores(categoria, sintoma))
 
             # Determine index dynamically to preserve user's previous selection
-            modificador_index = (
-                0
-                if not st.session_state.get("selected_modificador")
-                else modificadores.index(st.session_state.selected_modificador) + 1
-            )
+            modificador_index = _option_index(modificadores).get(modificador, 0)
 
             modificador = st.selectbox(
                 "3️⃣ ¿El síntoma está asociado con alguna de estas características? *",
-                options=["Seleccione una opción..."] + modificadores,
+                options=_options_with_placeholder(modificadores),
                 index=modificador_index,
                 help="Seleccione el modificador que mejor describe su situación",
                 key="modificador_select",
             )
 
-            if modificador != "Seleccione una opción...":
-                st.session_state.selected_modificador = modificador
-            else:
-                st.session_state.selected_modificador = None
+            if modificador == SELECT_PLACEHOLDER:
+                modificador = None
+
+        # Update the selections in session_state
+        state.selected_categoria = categoria
+        state.selected_sintoma = sintoma
+        state.selected_modificador = modificador
 
         # ------------  VALIDATION TRIAGE  --------------
         # Validate full selection
-        if all(
-            [
-                st.session_state.get("selected_categoria"),
-                st.session_state.get("selected_sintoma"),
-                st.session_state.get("selected_modificador"),
-            ]
-        ):
-            is_valid = validate_selection(
-                st.session_state.selected_categoria,
-                st.session_state.selected_sintoma,
-                st.session_state.selected_modificador,
-            )
+        if all([categoria, sintoma, modificador]):
+            is_valid = validate_selection(categoria, sintoma, modificador)
 
             if is_valid:
-                st.session_state["form_symptoms_completed"] = True
+                state["form_symptoms_completed"] = True
 
                 # ------------  TRIAGE RESULTS  --------------
                 # Get triage decision
-                triage_decision = get_triage_decision(
-                    st.session_state.selected_categoria,
-                    st.session_state.selected_sintoma,
-                    st.session_state.selected_modificador,
-                )
-                st.session_state["decision_triage"] = triage_decision["triage"]
-                st.session_state["decision_modalidad"] = triage_decision["modalidad"]
-                st.session_state["decision_especialidad"] = triage_decision[
-                    "especialidad"
-                ]
+                triage_decision = get_triage_decision(categoria, sintoma, modificador)
+                state["decision_triage"] = triage_decision["triage"]
+                state["decision_modalidad"] = triage_decision["modalidad"]
+                state["decision_especialidad"] = triage_decision["especialidad"]
 
                 return True
             else:
-                st.session_state["form_symptoms_completed"] = False
+                state["form_symptoms_completed"] = False
                 return False
 
         # If not all selections are complete, return False by default
@@ -488,15 +530,49 @@ def symptoms_form(
 
     except Exception:
         # Reset selections on error
-        st.session_state.selected_categoria = None
-        st.session_state.selected_sintoma = None
-        st.session_state.selected_modificador = None
+        state.selected_categoria = None
+        state.selected_sintoma = None
+        state.selected_modificador = None
 
         st.rerun()
 
         return False
 
 
+# Triage level -> (label color, icon, message function, guidance message)
+_EMERGENCY_DISPLAY = (
+    "#D32F2F",  # Red - Emergency
+    "🚨",
+    st.error,
+    "⚠️ **Atención inmediata requerida**\n\n"
+    "Diríjase a la sala de urgencias más cercana o llame al ***.",
+)
+TRIAGE_LEVEL_DISPLAY = {
+    "T1": _EMERGENCY_DISPLAY,
+    "T2": _EMERGENCY_DISPLAY,
+    "T3": (
+        "#F57C00",  # Orange - Urgent
+        "⚠️",
+        st.warning,
+        "📍 **Atención urgente**\n\nDebe acudir a urgencias lo antes posible.",
+    ),
+    "T4": (
+        "#FBC02D",  # Yellow - Priority
+        "⏱️",
+        st.info,
+        "📅 **Cita prioritaria**\n\n"
+        "Se recomienda agendar una cita médica prioritaria (<48 horas).",
+    ),
+    "T5": (
+        "#388E3C",  # Green - Regular
+        "✅",
+        st.success,
+        "📆 **Cita programada**\n\n"
+        "Puede agendar una cita médica de manera regular por nuestro sistema.",
+    ),
+}
+
+
 def display_triage_result():
     """
     Display the triage result panel in the Streamlit UI.
@@ -533,19 +609,10 @@ def display_triage_result():
             nivel = st.session_state.get("decision_triage", "N/A")
             decision = st.session_state.get("decision", "N/A")
 
-            # Define color and icon by severity level
-            if nivel in ["T1", "T2"]:
-                color = "#D32F2F"  # Red - Emergency
-                emoji = "🚨"
-            elif nivel == "T3":
-                color = "#F57C00"  # Orange - Urgent
-                emoji = "⚠️"
-            elif nivel == "T4":
-                color = "#FBC02D"  # Yellow - Priority
-                emoji = "⏱️"
-            else:  # T5 or undefined
-                color = "#388E3C"  # Green - Regular
-                emoji = "✅"
+            # Define color, icon and guidance by severity level (T5 or undefined by default)
+            color, emoji, show_message, message = TRIAGE_LEVEL_DISPLAY.get(
+                nivel, TRIAGE_LEVEL_DISPLAY["T5"]
+            )
 
             # Render colored triage label
             st.markdown(
@@ -583,26 +650,7 @@ def display_triage_result():
             st.markdown("")
 
             # Display contextual guidance message
-            if nivel in ["T1", "T2"]:
-                st.error(
-                    "⚠️ **Atención inmediata requerida**\n\n"
-                    "Diríjase a la sala de urgencias más cercana o llame al ***."
-                )
-            elif nivel == "T3":
-                st.warning(
-                    "📍 **Atención urgente**\n\n"
-                    "Debe acudir a urgencias lo antes posible."
-                )
-            elif nivel == "T4":
-                st.info(
-                    "📅 **Cita prioritaria**\n\n"
-                    "Se recomienda agendar una cita médica prioritaria (<48 horas)."
-                )
-            else:  # T5
-                st.success(
-                    "📆 **Cita programada**\n\n"
-                    "Puede agendar una cita médica de manera regular por nuestro sistema."
-                )
+            show_message(message)
 
         # ===========================
         # 🔹 Footer: Next Steps
@@ -1,5 +1,6 @@
 import streamlit as st
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
 
 # === Colombian Patient Data Constants ===
 
@@ -19,65 +20,144 @@ Utilidades para cargar y procesar datos de ubicaciones desde proveedores.
 """
 
 
+def _freeze_departamentos_ciudades(
+    departamentos_ciudades: Dict[str, List[str]],
+) -> Mapping[str, Tuple[str, ...]]:
+    """Versión de solo lectura del directorio (tuplas), segura para compartir entre sesiones."""
+    return MappingProxyType(
+        {dep: tuple(ciudades) for dep, ciudades in departamentos_ciudades.items()}
+    )
+
+
+# Directorio básico con las principales ciudades, usado si fallan los proveedores
+_FALLBACK_DEPARTAMENTOS_CIUDADES = _freeze_departamentos_ciudades(
+    {
+        "Antioquia": ["Medellin", "Bello", "Itagui", "Envigado", "Rionegro"],
+        "Atlantico": ["Barranquilla", "Soledad", "Malambo", "Sabanalarga"],
+        "Bogota D.C.": ["Bogota"],
+        "Bolivar": ["Cartagena", "Magangue", "Turbaco"],
+        "Boyaca": ["Tunja", "Duitama", "Sogamoso", "Chiquinquira"],
+        "Caldas": ["Manizales", "Villamaria", "Chinchina"],
+        "Caqueta": ["Florencia", "San Vicente del Caguan"],
+        "Casanare": ["Yopal", "Aguazul", "Villanueva"],
+        "Cauca": ["Popayan", "Santander de Quilichao", "Puerto Tejada"],
+        "Cesar": ["Valledupar", "Aguachica", "Bosconia"],
+        "Choco": ["Quibdo", "Istmina", "Acandi"],
+        "Cordoba": ["Monteria", "Cerete", "Lorica", "Sahagun"],
+        "Cundinamarca": ["Soacha", "Chia", "Zipaquira", "Facatativa", "Girardot"],
+        "Huila": ["Neiva", "Pitalito", "Garzon", "La Plata"],
+        "La Guajira": ["Riohacha", "Maicao", "Uribia"],
+        "Magdalena": ["Santa Marta", "Cienaga", "Fundacion"],
+        "Meta": ["Villavicencio", "Acacias", "Granada", "San Martin"],
+        "Nariño": ["Pasto", "Tumaco", "Ipiales"],
+        "Norte de Santander": ["Cucuta", "Ocaña", "Pamplona", "Villa del Rosario"],
+        "Putumayo": ["Mocoa", "Puerto Asis", "Orito"],
+        "Quindio": ["Armenia", "Calarca", "Montenegro"],
+        "Risaralda": ["Pereira", "Dosquebradas", "Santa Rosa de Cabal"],
+        "Santander": ["Bucaramanga", "Floridablanca", "Giron", "Piedecuesta"],
+        "Sucre": ["Sincelejo", "Corozal", "San Marcos"],
+        "Tolima": ["Ibague", "Espinal", "Melgar", "Honda"],
+        "Valle del Cauca": ["Cali", "Palmira", "Buenaventura", "Tulua", "Cartago"],
+    }
+)
+
+
 # == Location function ==
-@st.cache_data(ttl=3600, show_spinner=False)
-def get_departamentos_ciudades_from_providers() -> Dict[str, List[str]]:
+# El spinner solo aparece cuando la cache falla y la función realmente se ejecuta
+@st.cache_data(
+    persist="disk",
+    max_entries=8,
+    show_spinner="🔄 Cargando directorio de proveedores",
+)
+def _load_departamentos_ciudades(provider_data_version: int) -> Dict[str, List[str]]:
+    """
+    Extrae el diccionario departamento → municipios de los datos de proveedores.
+
+    Se persiste en disco para que un worker nuevo arranque con el directorio
+    disponible. `provider_data_version` solo forma parte de la clave: la
+    persistencia en disco ignora el ttl, así que datos nuevos de proveedores
+    generan una entrada nueva. Los errores se propagan para no persistir el
+    fallback.
+    """
+    from utils.matching_utils.recommendation_engine import (
+        load_and_prepare_provider_data,
+    )
+
+    # Cargar datos de proveedores
+    df_prestadores = load_and_prepare_provider_data()
+
+    # Verificar que existan las columnas necesarias
+    if (
+        "departamento" not in df_prestadores.columns
+        or "municipio" not in df_prestadores.columns
+    ):
+        raise ValueError(
+            "Las columnas 'departamento' y 'municipio' no existen en los datos de proveedores"
+        )
+
+    # Eliminar valores nulos
+    df_clean = df_prestadores[["departamento", "municipio"]].dropna()
+
+    # Agrupar por departamento y obtener ciudades únicas
+    departamentos_ciudades = {}
+
+    for departamento in sorted(df_clean["departamento"].unique()):
+        ciudades = sorted(
+            df_clean[df_clean["departamento"] == departamento]["municipio"]
+            .unique()
+            .tolist()
+        )
+        departamentos_ciudades[departamento] = ciudades
+
+    # Validar que haya al menos un departamento
+    if not departamentos_ciudades:
+        raise ValueError("No se encontraron departamentos en los datos de proveedores")
+
+    return departamentos_ciudades
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _get_departamentos_ciudades_shared(
+    provider_data_version: int,
+) -> Mapping[str, Tuple[str, ...]]:
+    """
+    Directorio congelado y compartido por referencia (sin copiar en cada rerun).
+
+    Una entrada por versión de los datos de proveedores, de modo que el
+    directorio se renueva cuando estos cambian. Los errores de
+    `_load_departamentos_ciudades` se propagan, así que el fallback nunca
+    queda guardado aquí.
+    """
+    return _freeze_departamentos_ciudades(
+        _load_departamentos_ciudades(provider_data_version)
+    )
+
+
+def get_departamentos_ciudades_from_providers() -> Mapping[str, Tuple[str, ...]]:
     """
     Genera el diccionario de departamentos y ciudades desde los datos de proveedores.
 
     Esta función extrae las ubicaciones únicas de los prestadores de salud
-    y las organiza en un diccionario departamento → lista de municipios.
+    y las organiza en un mapeo departamento → tupla de municipios.
+    El resultado se cachea en disco (ver `_load_departamentos_ciudades`) y se
+    comparte entre sesiones como estructura de solo lectura.
 
     Returns
     -------
-    dict
-        Diccionario con estructura {departamento: [ciudad1, ciudad2, ...]}.
+    Mapping
+        Mapeo de solo lectura {departamento: (ciudad1, ciudad2, ...)}.
         Ambos departamentos y ciudades están ordenados alfabéticamente.
 
     Examples
     --------
     >>> deptos = get_departamentos_ciudades_from_providers()
     >>> deptos["CUNDINAMARCA"]
-    ['BOGOTÁ', 'CHÍA', 'FACATATIVÁ', ...]
+    ('BOGOTÁ', 'CHÍA', 'FACATATIVÁ', ...)
     """
-    from utils.matching_utils.recommendation_engine import (
-        load_and_prepare_provider_data,
-    )
+    from utils.matching_utils.recommendation_engine import _provider_data_version
 
     try:
-        # Cargar datos de proveedores
-        df_prestadores = load_and_prepare_provider_data()
-
-        # Verificar que existan las columnas necesarias
-        if (
-            "departamento" not in df_prestadores.columns
-            or "municipio" not in df_prestadores.columns
-        ):
-            raise ValueError(
-                "Las columnas 'departamento' y 'municipio' no existen en los datos de proveedores"
-            )
-
-        # Eliminar valores nulos
-        df_clean = df_prestadores[["departamento", "municipio"]].dropna()
-
-        # Agrupar por departamento y obtener ciudades únicas
-        departamentos_ciudades = {}
-
-        for departamento in sorted(df_clean["departamento"].unique()):
-            ciudades = sorted(
-                df_clean[df_clean["departamento"] == departamento]["municipio"]
-                .unique()
-                .tolist()
-            )
-            departamentos_ciudades[departamento] = ciudades
-
-        # Validar que haya al menos un departamento
-        if not departamentos_ciudades:
-            raise ValueError(
-                "No se encontraron departamentos en los datos de proveedores"
-            )
-
-        return departamentos_ciudades
+        return _get_departamentos_ciudades_shared(_provider_data_version())
 
     except Exception as e:
         # Fallback: retornar diccionario básico con principales ciudades
@@ -85,31 +165,57 @@ def get_departamentos_ciudades_from_providers() -> Dict[str, List[str]]:
             f"⚠️ No se pudieron cargar ubicaciones desde proveedores: Usando ubicaciones por defecto."
         )
         st.expander("Error").write(e)
-        return {
-            "Antioquia": ["Medellin", "Bello", "Itagui", "Envigado", "Rionegro"],
-            "Atlantico": ["Barranquilla", "Soledad", "Malambo", "Sabanalarga"],
-            "Bogota D.C.": ["Bogota"],
-            "Bolivar": ["Cartagena", "Magangue", "Turbaco"],
-            "Boyaca": ["Tunja", "Duitama", "Sogamoso", "Chiquinquira"],
-            "Caldas": ["Manizales", "Villamaria", "Chinchina"],
-            "Caqueta": ["Florencia", "San Vicente del Caguan"],
-            "Casanare": ["Yopal", "Aguazul", "Villanueva"],
-            "Cauca": ["Popayan", "Santander de Quilichao", "Puerto Tejada"],
-            "Cesar": ["Valledupar", "Aguachica", "Bosconia"],
-            "Choco": ["Quibdo", "Istmina", "Acandi"],
-            "Cordoba": ["Monteria", "Cerete", "Lorica", "Sahagun"],
-            "Cundinamarca": ["Soacha", "Chia", "Zipaquira", "Facatativa", "Girardot"],
-            "Huila": ["Neiva", "Pitalito", "Garzon", "La Plata"],
-            "La Guajira": ["Riohacha", "Maicao", "Uribia"],
-            "Magdalena": ["Santa Marta", "Cienaga", "Fundacion"],
-            "Meta": ["Villavicencio", "Acacias", "Granada", "San Martin"],
-            "Nariño": ["Pasto", "Tumaco", "Ipiales"],
-            "Norte de Santander": ["Cucuta", "Ocaña", "Pamplona", "Villa del Rosario"],
-            "Putumayo": ["Mocoa", "Puerto Asis", "Orito"],
-            "Quindio": ["Armenia", "Calarca", "Montenegro"],
-            "Risaralda": ["Pereira", "Dosquebradas", "Santa Rosa de Cabal"],
-            "Santander": ["Bucaramanga", "Floridablanca", "Giron", "Piedecuesta"],
-            "Sucre": ["Sincelejo", "Corozal", "San Marcos"],
-            "Tolima": ["Ibague", "Espinal", "Melgar", "Honda"],
-            "Valle del Cauca": ["Cali", "Palmira", "Buenaventura", "Tulua", "Cartago"],
-        }
+        return _FALLBACK_DEPARTAMENTOS_CIUDADES
+
+
+@st.cache_data(persist="disk", max_entries=8, show_spinner=False)
+def _load_city_centroids(
+    provider_data_version: int,
+) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """
+    Medianas de coordenadas por municipio (ver `get_city_centroids`).
+
+    `provider_data_version` solo forma parte de la clave de la cache en disco.
+    """
+    from utils.matching_utils.recommendation_engine import (
+        load_and_prepare_provider_data,
+    )
+
+    df_prestadores = load_and_prepare_provider_data()
+    medianas = (
+        df_prestadores.dropna(subset=["departamento", "municipio", "lat", "lng"])
+        .groupby(["departamento", "municipio"], sort=False, observed=True)[
+            ["lat", "lng"]
+        ]
+        .median()
+    )
+
+    return {
+        key: (float(lat), float(lng))
+        for key, lat, lng in zip(medianas.index, medianas["lat"], medianas["lng"])
+    }
+
+
+def get_city_centroids() -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """
+    Calcula el centro aproximado de cada municipio a partir de los prestadores.
+
+    El resultado se cachea en disco por versión de los datos de proveedores,
+    así que se recalcula cuando estos cambian. Los errores de carga se
+    propagan al llamador.
+
+    Returns
+    -------
+    dict
+        Diccionario {(departamento, municipio): (lat, lng)} con la mediana de las
+        coordenadas de los prestadores de cada municipio.
+
+    Examples
+    --------
+    >>> centroids = get_city_centroids()
+    >>> centroids[("Antioquia", "Medellin")]
+    (6.2442, -75.5812)
+    """
+    from utils.matching_utils.recommendation_engine import _provider_data_version
+
+    return _load_city_centroids(_provider_data_version())
@@ -4,14 +4,45 @@ from geopy.exc import GeocoderTimedOut, GeocoderRateLimited, GeocoderUnavailable
 import time
 import requests
 
+# Factor usado para agrupar coordenadas en las caches de reverse geocoding (1e4 -> ~10 m)
+REVERSE_GEOCODE_SCALE = 10_000
+
 
 ###. OpenStreetMap Nominatim Geocoding #####
-@st.cache_data(show_spinner=False)
+@st.cache_data(persist="disk", max_entries=2048, show_spinner=False)
+def _get_coordinates_co_cached(city_key: str):
+    """Cached Nominatim city lookup keyed on the normalized name (see `get_coordinates_co`).
+
+    Raises `GeocoderUnavailable` when every attempt fails, so the failure is
+    not stored in the cache.
+    """
+    geolocator = Nominatim(user_agent="triage_app_geocode")
+
+    for _ in range(3):  # Try up to 3 times
+        try:
+            time.sleep(1)
+            location = geolocator.geocode(f"ciudad: {city_key}, Colombia", timeout=5)
+            if location:
+                return (location.latitude, location.longitude)
+            else:
+                location = geolocator.geocode(f"{city_key}, Colombia", timeout=5)
+                if location:
+                    return (location.latitude, location.longitude)
+                else:
+                    return None
+        except (GeocoderTimedOut, GeocoderRateLimited):
+            time.sleep(2)
+
+    raise GeocoderUnavailable(f"No response from Nominatim for '{city_key}'")
+
+
 def get_coordinates_co(city_name: str):
     """Get geographic coordinates for a Colombian city.
 
     This function uses OpenStreetMap's Nominatim service to geocode a city name
-    and retrieve its latitude and longitude coordinates.
+    and retrieve its latitude and longitude coordinates. Results are cached on
+    disk keyed on the normalized name (lowercase, collapsed spaces), so they
+    survive app restarts; failed lookups are not cached.
 
     Args:
         city_name (str): The name of the city to geocode.
@@ -24,32 +55,38 @@ def get_coordinates_co(city_name: str):
         >>> print(coords)
         (4.624335, -74.063644)
     """
+    city_key = " ".join(city_name.split()).lower()
 
-    geolocator = Nominatim(user_agent="triage_app_geocode")
+    try:
+        return _get_coordinates_co_cached(city_key)
+    except GeocoderUnavailable:
+        st.warning(f"No se pudieron obtener coordenadas para '{city_name}'.")
+        return (4.5709, -74.2973)  # Fallback (Colombia center)
 
-    for _ in range(3):  # Try up to 3 times
-        try:
-            time.sleep(1)
-            location = geolocator.geocode(f"ciudad: {city_name}, Colombia", timeout=5)
-            if location:
-                return (location.latitude, location.longitude)
-            else:
-                location = geolocator.geocode(f"{city_name}, Colombia", timeout=5)
-                if location:
-                    return (location.latitude, location.longitude)
-                else:
-                    return None
-        except (GeocoderTimedOut, GeocoderRateLimited):
-            time.sleep(2)
 
-    st.warning(f"No se pudieron obtener coordenadas para '{city_name}'.")
-    return (4.5709, -74.2973)  # Fallback (Colombia center)
+@st.cache_data(persist="disk", max_entries=1024, show_spinner=False)
+def _reverse_geocode_cached(lat_q: int, lon_q: int):
+    """Cached Nominatim lookup keyed on quantized coordinates (see `reverse_geocode`).
+
+    Connection errors propagate so they are not stored in the cache.
+    """
+    geolocator = Nominatim(user_agent="triage_app_geocode_reverse")
+    location = geolocator.reverse(
+        (lat_q / REVERSE_GEOCODE_SCALE, lon_q / REVERSE_GEOCODE_SCALE), language="es"
+    )
+    if location and location.address:
+        return location.address
+    return "Dirección no encontrada"
 
 
-@st.cache_data(show_spinner=False)
 def reverse_geocode(lat, lon):
     """Get human-readable address from geographic coordinates using OpenStreetMap (Nominatim).
 
+    Coordinates are quantized with `REVERSE_GEOCODE_SCALE` (~10 m) before the
+    cached lookup, so nearby clicks reuse the same result across reruns,
+    sessions and app restarts (disk-persisted cache). Connection errors are
+    not cached.
+
     Args:
         lat (float): Latitude of the location.
         lon (float): Longitude of the location.
@@ -66,13 +103,10 @@ def reverse_geocode(lat, lon):
         >>> reverse_geocode(40.7128, -74.0060)
         'New York, United States'
     """
-    geolocator = Nominatim(user_agent="triage_app_geocode_reverse")
     try:
-        location = geolocator.reverse((lat, lon), language="es")
-        if location and location.address:
-            return location.address
-        else:
-            return "Dirección no encontrada"
+        return _reverse_geocode_cached(
+            round(lat * REVERSE_GEOCODE_SCALE), round(lon * REVERSE_GEOCODE_SCALE)
+        )
     except (GeocoderTimedOut, GeocoderUnavailable):
         return "Error al conectar con el servicio"
 
@@ -80,18 +114,13 @@ def reverse_geocode(lat, lon):
 #####. ArcGIS Public Geocoding (Alternative) #####
 
 
-@st.cache_data(show_spinner=False)
-def geocode_address_arcgis(address: str):
+@st.cache_data(persist="disk", max_entries=4096, show_spinner=False)
+def _geocode_address_arcgis_cached(clean_address: str):
     """
-    Geocoding: Dirección -> Coordenadas
+    Geocoding cacheado por dirección normalizada (ver `geocode_address_arcgis`).
     """
     url = "https://geocode.arcgis.com/arcgis/rest/services/World/GeocodeServer/findAddressCandidates"
 
-    # Es buena práctica limpiar la dirección
-    clean_address = address.strip()
-    if not clean_address:
-        return None
-
     params = {
         "f": "json",
         "singleLine": f"{clean_address}, Colombia",  # Forzamos búsqueda en Colombia
@@ -99,46 +128,79 @@ def geocode_address_arcgis(address: str):
         "outFields": "Match_addr,Addr_type",
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()  # Lanza error si hay problemas de conexión
-        data = response.json()
+    # Los errores de conexión se propagan para que no queden guardados en la cache
+    response = requests.get(url, params=params, timeout=5)
+    response.raise_for_status()  # Lanza error si hay problemas de conexión
+    data = response.json()
 
-        if data.get("candidates"):
-            top = data["candidates"][0]
-            lat = top["location"]["y"]
-            lng = top["location"]["x"]
-            formatted = top["address"]
-            return {"lat": lat, "lng": lng, "address": formatted}
+    if data.get("candidates"):
+        top = data["candidates"][0]
+        lat = top["location"]["y"]
+        lng = top["location"]["x"]
+        formatted = top["address"]
+        return {"lat": lat, "lng": lng, "address": formatted}
 
+    return None
+
+
+def geocode_address_arcgis(address: str):
+    """
+    Geocoding: Dirección -> Coordenadas
+
+    La dirección se normaliza (minúsculas, espacios colapsados) antes de
+    consultar la cache, de modo que variaciones triviales no generan
+    nuevas peticiones a ArcGIS. La cache se persiste en disco para
+    sobrevivir a reinicios de la app; los fallos de conexión no se cachean.
+    """
+    # Es buena práctica limpiar la dirección
+    clean_address = " ".join(address.split()).lower()
+    if not clean_address:
+        return None
+
+    try:
+        return _geocode_address_arcgis_cached(clean_address)
     except Exception as e:
         st.error(f"Error conectando con el servicio de mapas: {e}")
         return None
 
-    return None
 
-
-@st.cache_data(show_spinner=False)
-def reverse_geocode_arcgis(lat: float, lng: float):
+@st.cache_data(persist="disk", max_entries=4096, show_spinner=False)
+def _reverse_geocode_arcgis_cached(lat_q: int, lng_q: int):
     """
-    Reverse Geocoding: Coordenadas -> Dirección aproximada
+    Reverse geocoding cacheado por coordenadas cuantizadas (ver `reverse_geocode_arcgis`).
     """
     url = "https://geocode.arcgis.com/arcgis/rest/services/World/GeocodeServer/reverseGeocode"
 
     params = {
+        # Nota: ArcGIS usa x,y (lng,lat)
         "f": "json",
-        "location": f"{lng},{lat}",  # Nota: ArcGIS usa x,y (lng,lat)
+        "location": f"{lng_q / REVERSE_GEOCODE_SCALE},{lat_q / REVERSE_GEOCODE_SCALE}",
         "distance": 100,  # Buscar en un radio de 100 metros
         "outSR": "",
     }
 
+    # Los errores de conexión se propagan para que no queden guardados en la cache
+    response = requests.get(url, params=params, timeout=5)
+    response.raise_for_status()
+    data = response.json()
+    if "address" in data:
+        return data["address"]["Match_addr"]
+
+    return "Dirección no encontrada"
+
+
+def reverse_geocode_arcgis(lat: float, lng: float):
+    """
+    Reverse Geocoding: Coordenadas -> Dirección aproximada
+
+    Las coordenadas se cuantizan a enteros (`REVERSE_GEOCODE_SCALE`) para que
+    clics cercanos reutilicen la misma entrada de cache entre sesiones y
+    reinicios (cache persistida en disco). Los fallos de conexión no se cachean.
+    """
     try:
-        response = requests.get(url, params=params, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if "address" in data:
-                return data["address"]["Match_addr"]
+        return _reverse_geocode_arcgis_cached(
+            round(lat * REVERSE_GEOCODE_SCALE), round(lng * REVERSE_GEOCODE_SCALE)
+        )
     except Exception:
         return "Dirección no encontrada"
 
-    return "Dirección no encontrada"
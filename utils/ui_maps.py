@@ -4,64 +4,49 @@ import folium
 from folium.plugins import MarkerCluster, LocateControl, Fullscreen
 
 from utils.ui_geocode import get_coordinates_co
+from utils.ui_data import get_city_centroids
 
+# Leaflet options shared by every base layer: keep a wider ring of already
+# loaded tiles and only request new ones once panning/zooming has finished,
+# so repeated moves reuse tiles instead of hitting OSM/Esri again.
+TILE_LAYER_OPTIONS = {
+    "keep_buffer": 4,
+    "update_when_idle": True,
+    "update_when_zooming": False,
+}
 
-def map_triage_locate(
-    ubicacion_usuario, modo_ubicacion="Manual", width: int = 800, height: int = 500
-):
+
+def build_triage_base_map(
+    center_lat: float, center_lng: float, modo_ubicacion: str = "Manual"
+) -> folium.Map:
     """
-    Display an interactive Folium map where the user can locate themselves.
+    Build the static part of the triage location map.
 
-    This function renders a Folium map embedded inside Streamlit using `st_folium`.
-    It includes several tile layers, location markers for major Colombian cities,
-    and map controls such as zoom, fullscreen, and locate buttons.
+    The map (tile layers, city markers and controls) only depends on the
+    user's city center and the location mode. A new map is built on every
+    call: `st_folium` adds `feature_group_to_add` to the map it receives, so
+    a map shared between reruns or sessions would keep other users' markers.
 
     Parameters
     ----------
-    width : int, optional
-        The width (in pixels) of the map container. Default is 800.
-    height : int, optional
-        The height (in pixels) of the map container. Default is 500.
+    center_lat : float
+        Latitude of the initial map center.
+    center_lng : float
+        Longitude of the initial map center.
+    modo_ubicacion : str, optional
+        "Manual" (click to locate) or "Auto" (device location). Default is "Manual".
 
     Returns
     -------
-    dict
-        The output object returned by `st_folium`, containing information such as
-        the last clicked coordinates, map bounds, and zoom level.
-        Example:
-            output = map_triage_locate()
-            coords = output["last_clicked"]
+    folium.Map
+        A new base map.
     """
-    # --- Determine initial map center ---
-
-    # Ensure city coordinates exist in session state
-    if "city_lat" not in st.session_state or "city_lon" not in st.session_state:
-        st.session_state.city_lat, st.session_state.city_lon = (
-            4.5709,
-            -74.2973,
-        )  # Default center (Colombia)
-
-    # If we already queried the city coordinates once, reuse them
-    if not st.session_state.get("coordinates_queried_ciudad", False):
-        # Only run the geocoding once
-        name_location = f"{st.session_state.get('ciudad', 'Colombia')}, {st.session_state.get('departamento', '')}"
-        coords = get_coordinates_co(name_location)
-
-        if coords:  # If geocoding succeeded
-            st.session_state.city_lat, st.session_state.city_lon = coords
-        else:
-            st.warning(
-                f"No se encontraron coordenadas para '{st.session_state.get('ciudad', 'Desconocida')}'."
-            )
-            st.session_state.city_lat, st.session_state.city_lon = (4.5709, -74.2973)
-
-        st.session_state.coordinates_queried_ciudad = True
-
     # Initialize map centered on user's city
     # If modo_ubicacion is "Auto", disable dragging to avoid conflicts with LocateControl
     if modo_ubicacion == "Auto":
         m = folium.Map(
-            location=[st.session_state["city_lat"], st.session_state["city_lon"]],
+            location=[center_lat, center_lng],
+            tiles=None,  # Base layers are added below
             zoom_start=15,
             dragging=False,  # ❌ Disable dragging
             scroll_wheel_zoom=False,  # ❌ Disable scroll wheel zoom
@@ -69,19 +54,12 @@ def map_triage_locate(
             double_click_zoom=False,  # ❌ Disable double click zoom
         )
     else:
-        # --- Center map on user's selected location if available ---
-        if ubicacion_usuario:
-            # Center on user's selected location
-            m = folium.Map(
-                location=[ubicacion_usuario["lat"], ubicacion_usuario["lng"]],
-                zoom_start=15,
-            )
-        else:
-            # Center on city coordinates
-            m = folium.Map(
-                location=[st.session_state["city_lat"], st.session_state["city_lon"]],
-                zoom_start=13,
-            )
+        # Center on city coordinates
+        m = folium.Map(
+            location=[center_lat, center_lng],
+            tiles=None,  # Base layers are added below
+            zoom_start=13,
+        )
     # --- Example markers for key Colombian cities ---
     coords = {
         "Bogotá": [4.65, -74.1],
@@ -98,21 +76,12 @@ def map_triage_locate(
             icon=folium.Icon(color="red", icon="hospital", prefix="fa"),
         ).add_to(cluster_ciudades)
 
-    # --- If the user has already selected a location, show the marker ---
-    if modo_ubicacion == "Manual" and ubicacion_usuario:
-        user_lat = ubicacion_usuario["lat"]
-        user_lng = ubicacion_usuario["lng"]
-        folium.Marker(
-            location=[user_lat, user_lng],
-            tooltip="Tu ubicación",
-            icon=folium.Icon(color="green", icon="user", prefix="fa"),
-        ).add_to(m)
-
     # --- Base map layers ---
     folium.TileLayer(
         "OpenStreetMap",
         name="Mapa base #1",
         show=True,
+        **TILE_LAYER_OPTIONS,
     ).add_to(m)
 
     # folium.TileLayer(
@@ -127,6 +96,7 @@ def map_triage_locate(
         attr="Tiles © Esri — Source: Esri, DeLorme, NAVTEQ, USGS, and others",
         name="Mapa base #2",
         show=False,
+        **TILE_LAYER_OPTIONS,
     ).add_to(m)
 
     folium.TileLayer(
@@ -134,6 +104,7 @@ def map_triage_locate(
         attr="Tiles © Esri, Maxar, Earthstar Geographics, and the GIS User Community",
         name="Imágenes satelitales",
         show=False,
+        **TILE_LAYER_OPTIONS,
     ).add_to(m)
 
     # --- Map controls ---
@@ -170,7 +141,117 @@ def map_triage_locate(
     # Mini map (disabled)
     # MiniMap().add_to(m)
 
+    return m
+
+
+def map_triage_locate(
+    ubicacion_usuario,
+    modo_ubicacion="Manual",
+    width: int = 800,
+    height: int = 500,
+    key: str = None,
+):
+    """
+    Display an interactive Folium map where the user can locate themselves.
+
+    This function renders a Folium map embedded inside Streamlit using `st_folium`.
+    It includes several tile layers, location markers for major Colombian cities,
+    and map controls such as zoom, fullscreen, and locate buttons.
+
+    Parameters
+    ----------
+    width : int, optional
+        The width (in pixels) of the map container. Default is 800.
+    height : int, optional
+        The height (in pixels) of the map container. Default is 500.
+    key : str, optional
+        Widget key for `st_folium`. When set, the last map output is also
+        available in `st.session_state[key]` before the map is rendered.
+
+    Returns
+    -------
+    dict
+        The output object returned by `st_folium`: the last clicked coordinates
+        in "Manual" mode, or the map center in "Auto" mode.
+        Example:
+            output = map_triage_locate()
+            coords = output["last_clicked"]
+    """
+    # --- Determine initial map center ---
+
+    # Ensure city coordinates exist in session state
+    if "city_lat" not in st.session_state or "city_lon" not in st.session_state:
+        st.session_state.city_lat, st.session_state.city_lon = (
+            4.5709,
+            -74.2973,
+        )  # Default center (Colombia)
+
+    # If we already queried the city coordinates once, reuse them
+    if not st.session_state.get("coordinates_queried_ciudad", False):
+        # Prefer the centroid of the city's providers (no network round-trip);
+        # if the provider data cannot be loaded, fall back to geocoding
+        try:
+            coords = get_city_centroids().get(
+                (
+                    st.session_state.get("departamento", ""),
+                    st.session_state.get("ciudad", ""),
+                )
+            )
+        except Exception:
+            coords = None
+
+        if coords is None:
+            # Only run the geocoding once
+            name_location = f"{st.session_state.get('ciudad', 'Colombia')}, {st.session_state.get('departamento', '')}"
+            coords = get_coordinates_co(name_location)
+
+        if coords:  # If geocoding succeeded
+            st.session_state.city_lat, st.session_state.city_lon = coords
+        else:
+            st.warning(
+                f"No se encontraron coordenadas para '{st.session_state.get('ciudad', 'Desconocida')}'."
+            )
+            st.session_state.city_lat, st.session_state.city_lon = (4.5709, -74.2973)
+
+        st.session_state.coordinates_queried_ciudad = True
+
+    # Base map (tiles, city markers, controls), built for this run only
+    m = build_triage_base_map(
+        st.session_state["city_lat"], st.session_state["city_lon"], modo_ubicacion
+    )
+
+    # --- If the user has already selected a location, show the marker ---
+    # The marker goes through feature_group_to_add, so moving it updates the
+    # mounted map instead of remounting the component
+    center, zoom, user_layer = None, None, None
+    if modo_ubicacion == "Manual" and ubicacion_usuario:
+        user_lat = ubicacion_usuario["lat"]
+        user_lng = ubicacion_usuario["lng"]
+
+        # Center on user's selected location
+        center, zoom = [user_lat, user_lng], 15
+
+        user_layer = folium.FeatureGroup(name="Tu ubicación")
+        folium.Marker(
+            location=[user_lat, user_lng],
+            tooltip="Tu ubicación",
+            icon=folium.Icon(color="green", icon="user", prefix="fa"),
+        ).add_to(user_layer)
+
     # --- Render in Streamlit ---
-    output = st_folium(m, width=width, height=height)
+    # Only return what each mode consumes, so panning/zooming the map does
+    # not trigger a rerun (the keyed component stays mounted between reruns)
+    returned_objects = ["center"] if modo_ubicacion == "Auto" else ["last_clicked"]
+
+    output = st_folium(
+        m,
+        width=width,
+        height=height,
+        center=center,
+        zoom=zoom,
+        feature_group_to_add=user_layer,
+        key=key,
+        returned_objects=returned_objects,
+    )
 
     return output
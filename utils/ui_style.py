@@ -12,10 +12,7 @@ WHITE = "#FFFFFF"  # White elements
 
 
 # -------------------------------------------------------------------------
-def style_layout():
-    """Apply global layout styles: background color, text font, and spacing."""
-    st.markdown(
-        f"""
+_LAYOUT_CSS = f"""
         <style>
         body {{
             background-color: {LIGHT_GRAY};
@@ -29,31 +26,31 @@ def style_layout():
             padding-bottom: 2rem;
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def style_layout():
+    """Apply global layout styles: background color, text font, and spacing."""
+    st.markdown(_LAYOUT_CSS, unsafe_allow_html=True)
 
 
 # -------------------------------------------------------------------------
-def style_header_footer():
-    """Hide Streamlit menu and footer, keep header visible."""
-    st.markdown(
-        """
+_HEADER_FOOTER_CSS = """
         <style>
         MainMenu {visibility: hidden;}
         header {visibility: visible;}
         footer {visibility: hidden;}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def style_header_footer():
+    """Hide Streamlit menu and footer, keep header visible."""
+    st.markdown(_HEADER_FOOTER_CSS, unsafe_allow_html=True)
 
 
 # -------------------------------------------------------------------------
-def style_buttons():
-    """Customize primary, secondary, and sidebar buttons with rounded edges and transitions."""
-    st.markdown(
-        f"""
+_BUTTONS_CSS = f"""
         <style>
         /* === General buttons === */
         div.stButton > button:first-child,
@@ -90,16 +87,16 @@ def style_buttons():
             color: {DARK_GRAY};
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def style_buttons():
+    """Customize primary, secondary, and sidebar buttons with rounded edges and transitions."""
+    st.markdown(_BUTTONS_CSS, unsafe_allow_html=True)
 
 
 # -------------------------------------------------------------------------
-def style_sidebar():
-    """Style sidebar area: background, button color, and spacing."""
-    st.markdown(
-        f"""
+_SIDEBAR_CSS = f"""
         <style>
         section[data-testid="stSidebar"] {{
             background-color: {LIGHT_BLUE};
@@ -111,16 +108,16 @@ def style_sidebar():
             border-radius: 8px;
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def style_sidebar():
+    """Style sidebar area: background, button color, and spacing."""
+    st.markdown(_SIDEBAR_CSS, unsafe_allow_html=True)
 
 
 # -------------------------------------------------------------------------
-def style_inputs():
-    """Apply uniform style for input fields like text, select, and text areas."""
-    st.markdown(
-        """
+_INPUTS_CSS = """
         <style>
         input, textarea, select {{
             border-radius: 8px !important;
@@ -128,16 +125,16 @@ def style_inputs():
             transition: 0.3s;
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def style_inputs():
+    """Apply uniform style for input fields like text, select, and text areas."""
+    st.markdown(_INPUTS_CSS, unsafe_allow_html=True)
 
 
 # -------------------------------------------------------------------------
-def style_headings():
-    """Set consistent heading colors and font weights."""
-    st.markdown(
-        f"""
+_HEADINGS_CSS = f"""
         <style>
         h1, h2, h3 {{
             color: {PRIMARY_BLUE};
@@ -150,16 +147,16 @@ def style_headings():
             color: {MID_GRAY};
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def style_headings():
+    """Set consistent heading colors and font weights."""
+    st.markdown(_HEADINGS_CSS, unsafe_allow_html=True)
 
 
 # -------------------------------------------------------------------------
-def style_cards():
-    """Add card-like styling for containers or dataframes (soft shadow and rounded corners)."""
-    st.markdown(
-        f"""
+_CARDS_CSS = f"""
         <style>
         .stDataFrame, .stTable {{
             border-radius: 12px;
@@ -174,16 +171,16 @@ def style_cards():
             box-shadow: 0 2px 5px rgba(0,0,0,0.05);
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def style_cards():
+    """Add card-like styling for containers or dataframes (soft shadow and rounded corners)."""
+    st.markdown(_CARDS_CSS, unsafe_allow_html=True)
 
 
 # -------------------------------------------------------------------------
-def style_scrollbar():
-    """Customize scrollbar style for a modern look."""
-    st.markdown(
-        f"""
+_SCROLLBAR_CSS = f"""
         <style>
         ::-webkit-scrollbar {{
             width: 8px;
@@ -193,19 +190,47 @@ def style_scrollbar():
             border-radius: 4px;
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def style_scrollbar():
+    """Customize scrollbar style for a modern look."""
+    st.markdown(_SCROLLBAR_CSS, unsafe_allow_html=True)
 
 
 # -------------------------------------------------------------------------
+_CHECKBOXES_CSS = """
+        <style>
+        .st-key-location_confirmation_checkbox label p {
+            font-size: 1.1rem !important;
+            font-weight: 600 !important;
+        }
+        </style>
+        """
+
+
+def style_checkboxes():
+    """Highlight the location confirmation checkbox label (scoped by widget key)."""
+    st.markdown(_CHECKBOXES_CSS, unsafe_allow_html=True)
+
+
+# -------------------------------------------------------------------------
+# Full theme built once at import time (same order as the individual style_* calls)
+_THEME_CSS = "".join(
+    [
+        _LAYOUT_CSS,
+        _HEADER_FOOTER_CSS,
+        _BUTTONS_CSS,
+        _SIDEBAR_CSS,
+        _INPUTS_CSS,
+        _HEADINGS_CSS,
+        # _CARDS_CSS,
+        _SCROLLBAR_CSS,
+        _CHECKBOXES_CSS,
+    ]
+)
+
+
 def general_style_orch():
-    """Orchestrate all style functions to apply the full visual theme."""
-    style_layout()
-    style_header_footer()
-    style_buttons()
-    style_sidebar()
-    style_inputs()
-    style_headings()
-    # style_cards()
-    style_scrollbar()
+    """Apply the full visual theme with a single markdown element."""
+    st.markdown(_THEME_CSS, unsafe_allow_html=True)